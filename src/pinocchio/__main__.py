@@ -1,15 +1,26 @@
+import argparse
 import asyncio
 import logging
 
 from .agent.loop import AgentLoop
+from .agent.server import AgentServer
 from .config import get_settings
 from .hardware.gpio import cleanup_hardware, init_hardware
+from .speech.engine import cleanup_speech, init_speech
 from .utils.colors import print_banner
 from .utils.logger import setup_logging
 
 
 def main():
     """Main entry point for Pi-nocchio."""
+    parser = argparse.ArgumentParser(prog="pinocchio", description="Give an LLM a physical body.")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="serve an HTTP API for several clients instead of the terminal chat",
+    )
+    args = parser.parse_args()
+
     # Try to get log level from config, fall back to INFO if config fails
     try:
         config = get_settings()
@@ -27,7 +38,8 @@ def main():
             config = get_settings()
         except Exception as e:
             print(f"\nError loading configuration: {e}")
-            print("Make sure you have a .env file with OPENROUTER_API_KEY set.\n")
+            print("Make sure you have a .env file with OPENROUTER_API_KEY set")
+            print("(or LLM_BACKEND=fake to try Pi-nocchio offline).\n")
             return
 
     # Print welcome banner
@@ -37,17 +49,21 @@ def main():
 
     # Initialize GPIO hardware
     logger.info("Initializing GPIO hardware...")
-    init_hardware()
+    init_hardware(config.gpio_backend)
+
+    # Load the Piper voice once, so speaking does not reload it every time
+    init_speech()
 
-    agent = AgentLoop(config)
+    agent = AgentServer(config) if args.serve else AgentLoop(config)
 
     try:
-        asyncio.run(agent.run())
+        asyncio.run(agent.serve() if args.serve else agent.run())
     except KeyboardInterrupt:
         logger.info("Shutting down Pi-nocchio...")
     finally:
         # Clean up GPIO resources
         cleanup_hardware()
+        cleanup_speech()
 
 
 if __name__ == "__main__":
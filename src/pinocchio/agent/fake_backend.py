@@ -0,0 +1,182 @@
+"""In-process stand-in for an OpenAI-compatible chat completions API.
+
+Used with LLM_BACKEND=fake to run and benchmark the agent offline. Replies come
+from a YAML script, tool calls included, with configurable latency, and are
+served over the same wire format (JSON or server-sent events) as the real API,
+so everything above the HTTP transport runs unchanged.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import httpx
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+class FakeLLMTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers chat completion requests from a script.
+
+    Script format (all keys optional):
+
+        rules:
+          - match: "what time"        # Case-insensitive text in the last user message
+            tool_calls:               # Requested first...
+              - name: get_time
+                arguments: {}
+            reply: "There you go!"    # ...then this once the tool results are back
+        default_reply: "You said: {message}"
+    """
+
+    def __init__(self, script: dict, latency: float = 0.0, token_interval: float = 0.0):
+        self.rules: list[dict] = script.get("rules") or []
+        self.default_reply: str = script.get("default_reply", "You said: {message}")
+        self.latency = latency  # Seconds before the first token
+        self.token_interval = token_interval  # Seconds between streamed tokens
+        self._call_count = 0
+
+    @classmethod
+    def from_file(cls, path: Path, latency: float = 0.0, token_interval: float = 0.0):
+        """Load the script from a YAML file, falling back to echoing the user."""
+        script = {}
+        if path.exists():
+            with open(path) as f:
+                script = yaml.safe_load(f) or {}
+        else:
+            logger.warning(f"Fake LLM script not found at {path}, echoing messages back")
+        return cls(script, latency, token_interval)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "POST" or not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(200, json={})  # Warm-up pings and anything else
+
+        body = json.loads(await request.aread())
+        message, finish_reason = self._reply(body["messages"])
+        usage = self._usage(body["messages"], message)
+
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            events = self._stream(
+                body["model"], message, finish_reason, usage if include_usage else None
+            )
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, content=events
+            )
+
+        await asyncio.sleep(self.latency)
+        return httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            },
+        )
+
+    def _reply(self, messages: list[dict]) -> tuple[dict, str]:
+        """Pick the scripted reply for a conversation."""
+        user_text = next((self._text(m) for m in reversed(messages) if m["role"] == "user"), "")
+        waiting_for_tools = messages[-1]["role"] != "tool"
+
+        rule = next(
+            (
+                rule
+                for rule in self.rules
+                if not rule.get("match") or rule["match"].lower() in user_text.lower()
+            ),
+            None,
+        )
+
+        if rule is not None and rule.get("tool_calls") and waiting_for_tools:
+            tool_calls = []
+            for tool_call in rule["tool_calls"]:
+                self._call_count += 1
+                tool_calls.append(
+                    {
+                        "id": f"call_fake_{self._call_count}",
+                        "type": "function",
+                        "function": {
+                            "name": tool_call["name"],
+                            "arguments": json.dumps(tool_call.get("arguments") or {}),
+                        },
+                    }
+                )
+            return {"role": "assistant", "content": None, "tool_calls": tool_calls}, "tool_calls"
+
+        reply = rule.get("reply") if rule is not None else None
+        content = (reply or self.default_reply).format(message=user_text)
+        return {"role": "assistant", "content": content}, "stop"
+
+    async def _stream(
+        self, model: str, message: dict, finish_reason: str, usage: dict | None
+    ) -> AsyncIterator[bytes]:
+        """Yield the reply as server-sent events, a word or argument piece at a time."""
+
+        def event(choices: list[dict], **extra) -> bytes:
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra,
+            }
+            return f"data: {json.dumps(chunk)}\n\n".encode()
+
+        def delta(**fields) -> list[dict]:
+            return [{"index": 0, "delta": fields, "finish_reason": None}]
+
+        await asyncio.sleep(self.latency)
+        yield event(delta(role="assistant", content=""))
+
+        content = message.get("content") or ""
+        for index, word in enumerate(content.split(" ") if content else []):
+            await asyncio.sleep(self.token_interval)
+            yield event(delta(content=word if index == 0 else " " + word))
+
+        for index, tool_call in enumerate(message.get("tool_calls") or []):
+            header = {
+                "index": index,
+                "id": tool_call["id"],
+                "type": "function",
+                "function": {"name": tool_call["function"]["name"], "arguments": ""},
+            }
+            yield event(delta(tool_calls=[header]))
+
+            arguments = tool_call["function"]["arguments"]
+            for start in range(0, len(arguments), 8):
+                await asyncio.sleep(self.token_interval)
+                piece = {"index": index, "function": {"arguments": arguments[start : start + 8]}}
+                yield event(delta(tool_calls=[piece]))
+
+        yield event([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+        if usage is not None:
+            yield event([], usage=usage)
+        yield b"data: [DONE]\n\n"
+
+    @staticmethod
+    def _text(message: dict) -> str:
+        """Plain text of a message whose content may be a list of parts."""
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            return " ".join(part.get("text", "") for part in content)
+        return content
+
+    @staticmethod
+    def _usage(messages: list[dict], message: dict) -> dict:
+        """Rough token counts, so usage reporting has something to show."""
+        prompt_tokens = len(json.dumps(messages)) // 4
+        completion_tokens = len(json.dumps(message)) // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
@@ -0,0 +1,127 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(message: dict) -> int:
+    """Roughly estimate how many prompt tokens a message costs (~4 characters per token)."""
+    content = message.get("content") or ""
+    if not isinstance(content, str):
+        content = json.dumps(content)
+
+    size = len(content)
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call["function"]
+        size += len(function["name"]) + len(function["arguments"])
+
+    return size // 4 + 4  # Plus a few tokens of per-message overhead
+
+
+class ConversationHistory:
+    """Conversation messages with a running token estimate, trimmed to a token budget.
+
+    Each message's estimate is computed once when it is appended, so checking the
+    budget costs nothing per turn. Trimming drops whole turns from the front, so
+    an assistant message with tool calls is never separated from its tool results
+    and the history always starts with a user message. The turn in progress is
+    never dropped.
+
+    The system message and an optional summary of dropped turns are pinned at the
+    front and never trimmed, so `messages` can be sent to the model as it is and
+    always starts with the same stable prefix. The system message does not count
+    toward the budget.
+    """
+
+    def __init__(self, token_budget: int, system_message: dict | None = None):
+        self.token_budget = token_budget
+        self.messages: list[dict] = []
+        self.total_tokens = 0
+        self._tokens: list[int] = []  # Estimate for each message in `messages`
+        self._last_user_index: int | None = None
+        self._pinned = 0  # Leading messages that are never trimmed
+        self._has_summary = False
+
+        if system_message is not None:
+            self.messages.append(system_message)
+            self._tokens.append(0)
+            self._pinned = 1
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def append(self, message: dict):
+        """Add a message and account for its tokens."""
+        tokens = estimate_tokens(message)
+
+        if message["role"] == "user":
+            self._last_user_index = len(self.messages)
+
+        self.messages.append(message)
+        self._tokens.append(tokens)
+        self.total_tokens += tokens
+
+    def set_summary(self, summary: str):
+        """Set the summary of earlier, already dropped turns."""
+        message = {
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{summary}",
+        }
+        tokens = estimate_tokens(message)
+
+        if self._has_summary:
+            index = self._pinned - 1
+            self.total_tokens -= self._tokens[index]
+            self.messages[index] = message
+            self._tokens[index] = tokens
+        else:
+            self.messages.insert(self._pinned, message)
+            self._tokens.insert(self._pinned, tokens)
+            if self._last_user_index is not None:
+                self._last_user_index += 1
+            self._pinned += 1
+            self._has_summary = True
+
+        self.total_tokens += tokens
+
+    def trim(self) -> list[dict]:
+        """Drop the oldest turns until the history fits the budget.
+
+        Returns the dropped messages, oldest first.
+        """
+        if self.total_tokens <= self.token_budget or self._last_user_index is None:
+            return []
+
+        start = self._pinned
+
+        # Walk forward from the front, only cutting where a user message starts a turn
+        cut = start
+        removed_tokens = 0
+        dropped_tokens = 0
+        index = start
+        while index < self._last_user_index:
+            dropped_tokens += self._tokens[index]
+            index += 1
+            if self.messages[index]["role"] == "user":
+                cut = index
+                removed_tokens = dropped_tokens
+                if self.total_tokens - removed_tokens <= self.token_budget:
+                    break
+
+        if cut == start:
+            return []
+
+        dropped = self.messages[start:cut]
+        del self.messages[start:cut]
+        del self._tokens[start:cut]
+        self.total_tokens -= removed_tokens
+        self._last_user_index -= cut - start
+
+        logger.debug(
+            f"Trimmed {len(dropped)} messages ({removed_tokens} tokens) from history, "
+            f"{self.total_tokens}/{self.token_budget} tokens left"
+        )
+        return dropped
@@ -0,0 +1,70 @@
+import json
+import logging
+import re
+import uuid
+
+from ..tools.registry import ToolRegistry
+from .llm import ToolCall
+
+logger = logging.getLogger(__name__)
+
+# Politeness around a command that should not stop it from matching
+PREFIX = r"(?:(?:hey |hi |ok )?pi-?nocchio,? )?(?:please |can you |could you |will you )?"
+SUFFIX = r"(?: please| now| for me)?"
+
+
+class IntentMatcher:
+    """Matches simple commands to tool calls locally, without asking the model.
+
+    Each tool lists the phrases it handles in `BaseTool.intents`: a regular
+    expression mapped to fixed arguments, with named groups filling in the
+    rest. The whole message has to match, so anything more than a bare
+    command still goes to the model.
+    """
+
+    def __init__(self, tool_registry: ToolRegistry):
+        self.patterns: list[tuple[re.Pattern, str, dict]] = []
+        for tool in tool_registry.tools.values():
+            for pattern, arguments in tool.intents.items():
+                compiled = re.compile(f"{PREFIX}(?:{pattern}){SUFFIX}", re.IGNORECASE)
+                self.patterns.append((compiled, tool.name, arguments))
+        self._tools = tool_registry.tools
+        logger.debug(f"Loaded {len(self.patterns)} intent patterns")
+
+    def match(self, text: str) -> ToolCall | None:
+        """Return the tool call for a message, or None if the model should handle it."""
+        text = " ".join(text.lower().split()).rstrip(".!?")
+
+        for pattern, tool_name, fixed_arguments in self.patterns:
+            found = pattern.fullmatch(text)
+            if found is None:
+                continue
+
+            arguments = dict(fixed_arguments)
+            for name, value in found.groupdict().items():
+                if value is not None:
+                    arguments[name] = value
+            if not self._valid(tool_name, arguments):
+                continue
+
+            logger.debug(f"Intent matched {tool_name}{arguments} for {text!r}")
+            tool_call_id = f"call_local_{uuid.uuid4().hex[:24]}"
+            return ToolCall(tool_call_id, tool_name, json.dumps(arguments))
+
+        return None
+
+    def _valid(self, tool_name: str, arguments: dict) -> bool:
+        """Check captured values against the tool's parameters, converting numbers."""
+        parameters = self._tools[tool_name].parameters
+        for name, value in arguments.items():
+            parameter = parameters.get(name)
+            if parameter is None:
+                return False
+            if parameter.enum and value not in parameter.enum:
+                return False
+            if parameter.type == "number" and isinstance(value, str):
+                try:
+                    arguments[name] = float(value)
+                except ValueError:
+                    return False
+        return True
@@ -1,27 +1,244 @@
+import asyncio
+import functools
+import json
 import logging
+import random
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from pathlib import Path
 
-from openai import AsyncOpenAI
+import httpx
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, NotFoundError
 
 from ..config import Settings
+from .fake_backend import FakeLLMTransport
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+FAKE_BASE_URL = "http://fake-llm.local/v1"  # Never resolved, the fake transport answers
+
+
+class LLMError(Exception):
+    """Raised when a request failed on every attempt and every fallback model."""
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an API error is transient (network trouble, rate limit or server error)."""
+    if isinstance(error, APIConnectionError):  # Includes timeouts
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class ToolCall:
+    """A function call requested by the model."""
+
+    def __init__(self, id: str = "", name: str = "", arguments: str = ""):
+        self.id = id
+        self.name = name
+        self.arguments = arguments  # Raw JSON string, may be partial while streaming
+
+    def parse_arguments(self) -> dict | None:
+        """Parse the arguments, returning None if they are not a complete JSON object yet."""
+        try:
+            arguments = json.loads(self.arguments or "{}")
+        except json.JSONDecodeError:
+            return None
+        return arguments if isinstance(arguments, dict) else None
+
+    def to_dict(self) -> dict:
+        """Convert to the OpenAI message format."""
+        return {
+            "id": self.id,
+            "type": "function",
+            "function": {"name": self.name, "arguments": self.arguments},
+        }
+
+
+class AssistantMessage:
+    """A complete assistant reply, either returned whole or assembled from a stream."""
+
+    def __init__(
+        self,
+        content: str | None = None,
+        tool_calls: list[ToolCall] | None = None,
+        finish_reason: str | None = None,
+        usage: dict | None = None,
+    ):
+        self.content = content
+        self.tool_calls = tool_calls or []
+        self.finish_reason = finish_reason
+        self.usage = usage  # Token counts reported by the provider, if any
+
+    def to_dict(self) -> dict:
+        """Convert to the OpenAI message format for the conversation history."""
+        message = {"role": "assistant", "content": self.content}
+        if self.tool_calls:
+            message["tool_calls"] = [tool_call.to_dict() for tool_call in self.tool_calls]
+        return message
+
+    @classmethod
+    def from_dict(cls, message: dict) -> "AssistantMessage":
+        """Build from the OpenAI message format."""
+        tool_calls = [
+            ToolCall(
+                tool_call["id"],
+                tool_call["function"]["name"],
+                tool_call["function"]["arguments"],
+            )
+            for tool_call in message.get("tool_calls") or []
+        ]
+        finish_reason = "tool_calls" if tool_calls else "stop"
+        return cls(message.get("content"), tool_calls, finish_reason)
+
+
+class StreamEvent:
+    """An incremental update from a streamed chat completion."""
+
+    CONTENT = "content"  # A text delta in `text`
+    TOOL_CALL_DELTA = "tool_call_delta"  # `tool_call` received another fragment
+    TOOL_CALL = "tool_call"  # `tool_call` is complete and can be executed
+    DONE = "done"  # The stream finished, full reply in `message`
+
+    def __init__(
+        self,
+        type: str,
+        text: str | None = None,
+        tool_call: ToolCall | None = None,
+        message: AssistantMessage | None = None,
+    ):
+        self.type = type
+        self.text = text
+        self.tool_call = tool_call
+        self.message = message
+
 
 class LLMClient:
-    """OpenRouter API client using OpenAI SDK."""
+    """Chat completions client for OpenRouter or any OpenAI-compatible API, using the OpenAI SDK."""
 
     def __init__(self, config: Settings):
         self.config = config
+        timeout = httpx.Timeout(config.http_read_timeout, connect=config.http_connect_timeout)
+        self.http_client = self._build_http_client(config, timeout)
         self.client = AsyncOpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=config.openrouter_api_key,
+            base_url=self._base_url(config),
+            api_key=config.llm_api_key or config.openrouter_api_key or "not-needed",
             default_headers={
                 "HTTP-Referer": config.app_url,
                 "X-Title": "pi-nocchio",
             },
+            http_client=self.http_client,
+            timeout=timeout,
+            max_retries=0,  # Retries, hedging and fallbacks are handled by _request
         )
+        self._last_request_at = 0.0
+        self._keepalive_task: asyncio.Task | None = None
         self.model = config.model_name
+        self.prompt_caching = config.prompt_caching
         self.system_prompt = self._build_system_prompt()
+        # Built once so every request starts with the exact same bytes
+        system_content = self.system_prompt
+        if self.prompt_caching:
+            system_content = self._cacheable(self.system_prompt)
+        self.system_message = {"role": "system", "content": system_content}
+        self.response_cache = None
+        if config.response_cache_enabled:
+            self.response_cache = ResponseCache(
+                Path(config.response_cache_path).expanduser(),
+                ttl=config.response_cache_ttl,
+                max_entries=config.response_cache_max_entries,
+                memory_entries=config.response_cache_memory_entries,
+            )
+        # Running totals across all requests, to check what prompt caching saves
+        self.usage_totals = {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "uncached_tokens": 0,
+            "completion_tokens": 0,
+        }
+
+    @staticmethod
+    def _base_url(config: Settings) -> str:
+        """API endpoint for the configured backend."""
+        if config.llm_base_url:
+            return config.llm_base_url
+        if config.llm_backend == "fake":
+            return FAKE_BASE_URL
+        if config.llm_backend != "openrouter":
+            raise ValueError(f"LLM_BASE_URL is required for the {config.llm_backend} backend")
+        return OPENROUTER_BASE_URL
+
+    @staticmethod
+    def _build_http_client(config: Settings, timeout: httpx.Timeout) -> httpx.AsyncClient:
+        """Build the pooled HTTP transport shared by every request."""
+        if config.llm_backend == "fake":
+            logger.info("Using the fake LLM backend, replies are scripted")
+            transport = FakeLLMTransport.from_file(
+                Path(config.fake_llm_script),
+                latency=config.fake_llm_latency,
+                token_interval=config.fake_llm_token_interval,
+            )
+            return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+        http2 = config.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 needs the h2 package, using HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=config.http_max_connections,
+                max_keepalive_connections=config.http_max_keepalive_connections,
+                keepalive_expiry=config.http_keepalive_expiry,
+            ),
+            timeout=timeout,
+            follow_redirects=True,
+        )
+
+    async def start(self):
+        """Open a connection to the API ahead of the first request and keep it warm.
+
+        Pre-warming pays for DNS, TCP and TLS at startup instead of on the user's
+        first message. A background task then pings the API whenever the client
+        has been idle for `llm_keepalive_interval` seconds, so the pooled
+        connection does not expire between conversations.
+        """
+        await self.warm_up()
+
+        if self.config.llm_keepalive_interval > 0 and self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keep_alive())
+
+    async def warm_up(self):
+        """Establish (or refresh) a pooled connection to the API."""
+        started = time.monotonic()
+        try:
+            # Any response will do, the point is the open connection left in the pool
+            await self.http_client.head(str(self.client.base_url))
+        except httpx.HTTPError as e:
+            logger.debug(f"Connection warm-up failed: {e}")
+            return
+
+        self._last_request_at = time.monotonic()
+        logger.debug(f"Connection to LLM API warm ({self._last_request_at - started:.3f}s)")
+
+    async def _keep_alive(self):
+        """Ping the API whenever the client has been idle for the keep-alive interval."""
+        interval = self.config.llm_keepalive_interval
+        while True:
+            idle = time.monotonic() - self._last_request_at
+            if idle >= interval:
+                await self.warm_up()
+                idle = 0
+            await asyncio.sleep(interval - idle)
 
     def _build_system_prompt(self) -> str:
         """Build the system prompt for Pi-nocchio."""
@@ -50,20 +267,364 @@ When you use a tool, explain what you're doing naturally in conversation. Wait f
 
 Remember: You're not just executing commands - you're experiencing the world through your sensors and actuators. Every interaction is part of your journey to become "real"."""
 
-    async def chat_completion(
-        self, messages: list[dict], tools: list[dict] | None = None
-    ):
-        """Send chat completion request with optional tools."""
-        full_messages = [{"role": "system", "content": self.system_prompt}, *messages]
+    @staticmethod
+    def _cacheable(text: str) -> list[dict]:
+        """Wrap text in a content part carrying a prompt-cache breakpoint."""
+        return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+    def _mark_cache_breakpoint(self, messages: list[dict]) -> list[dict]:
+        """Put a cache breakpoint on the newest text message of the conversation.
+
+        Everything up to that message is unchanged in the next tool-loop request,
+        so the provider can serve it from cache then. The system message carries
+        its own breakpoint, which also covers the tool definitions sent before it.
+        """
+        for index in range(len(messages) - 1, 0, -1):
+            message = messages[index]
+            if isinstance(message.get("content"), str) and message["content"]:
+                marked = {**message, "content": self._cacheable(message["content"])}
+                return [*messages[:index], marked, *messages[index + 1 :]]
+        return messages
+
+    def _build_request(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None,
+        model: str | None = None,
+        system_prompt: str | None = None,
+    ) -> dict:
+        """Build the keyword arguments for a chat completion request.
+
+        Messages that already start with a system message (like the agent's
+        conversation history) are sent as they are, without copying them.
+        """
+        if system_prompt is not None:
+            messages = [{"role": "system", "content": system_prompt}, *messages]
+        elif not messages or messages[0]["role"] != "system":
+            messages = [self.system_message, *messages]
+
+        if self.prompt_caching:
+            messages = self._mark_cache_breakpoint(messages)
 
         kwargs = {
-            "model": self.model,
-            "messages": full_messages,
+            "model": model or self.model,
+            "messages": messages,
         }
 
         if tools:
             kwargs["tools"] = tools
 
-        response = await self.client.chat.completions.create(**kwargs)
+        return kwargs
+
+    def _cache_key(self, kwargs: dict, use_cache: bool) -> str | None:
+        """Cache key for a request, or None if the response cache should not be used."""
+        if self.response_cache is None or not use_cache:
+            return None
+        return self.response_cache.make_key(kwargs)
+
+    async def _cached_response(self, key: str | None) -> AssistantMessage | None:
+        """Look up a cached response, giving replayed tool calls fresh ids."""
+        if key is None:
+            return None
+
+        cached = await self.response_cache.get(key)
+        if cached is None:
+            return None
+
+        logger.debug("Replaying cached LLM response")
+        message = AssistantMessage.from_dict(cached)
+        # Tool call ids must stay unique within a conversation
+        for tool_call in message.tool_calls:
+            tool_call.id = f"call_{uuid.uuid4().hex[:24]}"
+        return message
+
+    def _store_response(self, key: str | None, message: AssistantMessage):
+        """Cache a response if it finished normally."""
+        if key is not None and message.finish_reason in ("stop", "tool_calls"):
+            self.response_cache.put(key, message.to_dict())
+
+    def _record_usage(self, usage) -> dict | None:
+        """Convert the provider's usage report and add it to the running totals."""
+        if usage is None:
+            return None
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+        report = {
+            "prompt_tokens": usage.prompt_tokens,
+            "cached_tokens": cached,
+            "uncached_tokens": usage.prompt_tokens - cached,
+            "completion_tokens": usage.completion_tokens,
+        }
+
+        self.usage_totals["requests"] += 1
+        for key, value in report.items():
+            self.usage_totals[key] += value
+
+        logger.debug(
+            f"Token usage: {report['prompt_tokens']} prompt "
+            f"({report['cached_tokens']} cached, {report['uncached_tokens']} uncached), "
+            f"{report['completion_tokens']} completion"
+        )
+        return report
+
+    async def chat_completion(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        model: str | None = None,
+        system_prompt: str | None = None,
+        use_cache: bool = True,
+    ) -> AssistantMessage:
+        """Send chat completion request with optional tools.
+
+        `model` and `system_prompt` override the agent's defaults for side requests
+        such as history summaries. `use_cache=False` bypasses the response cache.
+        """
+        kwargs = self._build_request(messages, tools, model, system_prompt)
+
+        cache_key = self._cache_key(kwargs, use_cache)
+        cached = await self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        response = await self._request(kwargs, self._create)
+
+        choice = response.choices[0]
+        tool_calls = [
+            ToolCall(tool_call.id, tool_call.function.name, tool_call.function.arguments)
+            for tool_call in choice.message.tool_calls or []
+        ]
+        message = AssistantMessage(
+            choice.message.content,
+            tool_calls,
+            choice.finish_reason,
+            self._record_usage(response.usage),
+        )
+        self._store_response(cache_key, message)
+        return message
+
+    async def stream_chat_completion(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        model: str | None = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[StreamEvent]:
+        """Stream a chat completion, yielding text deltas and tool calls as they arrive.
+
+        Tool call fragments are assembled incrementally. A tool call is reported as
+        complete as soon as the model starts the next one or the stream ends, so the
+        caller can start executing it while the rest of the reply is still generating.
+        Cached responses are replayed as a single burst of events.
+        """
+        kwargs = self._build_request(messages, tools, model)
+
+        cache_key = self._cache_key(kwargs, use_cache)
+        cached = await self._cached_response(cache_key)
+        if cached is not None:
+            if cached.content:
+                yield StreamEvent(StreamEvent.CONTENT, text=cached.content)
+            for tool_call in cached.tool_calls:
+                yield StreamEvent(StreamEvent.TOOL_CALL, tool_call=tool_call)
+            yield StreamEvent(StreamEvent.DONE, message=cached)
+            return
+
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+
+        first_chunk, stream = await self._request(kwargs, self._open_stream)
+
+        content_parts: list[str] = []
+        tool_calls: dict[int, ToolCall] = {}
+        current: ToolCall | None = None
+        finish_reason = None
+        usage = None
+
+        async for chunk in self._iter_stream(first_chunk, stream):
+            # Usage arrives in a final chunk without choices
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+
+            if not chunk.choices:
+                continue
+
+            choice = chunk.choices[0]
+            delta = choice.delta
+
+            if delta.content:
+                content_parts.append(delta.content)
+                yield StreamEvent(StreamEvent.CONTENT, text=delta.content)
+
+            for fragment in delta.tool_calls or []:
+                tool_call = tool_calls.get(fragment.index)
+
+                if tool_call is None:
+                    # A new tool call means the previous one's arguments are complete
+                    if current is not None:
+                        yield StreamEvent(StreamEvent.TOOL_CALL, tool_call=current)
+                    tool_call = tool_calls[fragment.index] = ToolCall()
+                    current = tool_call
+
+                if fragment.id:
+                    tool_call.id = fragment.id
+                if fragment.function:
+                    if fragment.function.name:
+                        tool_call.name = fragment.function.name
+                    if fragment.function.arguments:
+                        tool_call.arguments += fragment.function.arguments
+
+                yield StreamEvent(StreamEvent.TOOL_CALL_DELTA, tool_call=tool_call)
+
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+
+        if current is not None:
+            yield StreamEvent(StreamEvent.TOOL_CALL, tool_call=current)
+
+        message = AssistantMessage(
+            "".join(content_parts) or None,
+            [tool_calls[index] for index in sorted(tool_calls)],
+            finish_reason,
+            self._record_usage(usage),
+        )
+        self._store_response(cache_key, message)
+        yield StreamEvent(StreamEvent.DONE, message=message)
+
+    async def _request(self, kwargs: dict, call: Callable[[dict], Awaitable]):
+        """Run a request with retries, hedging, model fallback and an overall deadline.
+
+        Transient errors (network, 408/409/429, 5xx) are retried with exponential
+        backoff and full jitter, honouring Retry-After. When a model keeps failing
+        or is not available, the next model is tried: `model_name` for requests
+        sent to another model, then each of `fallback_models`. The deadline
+        covers all of this, up to the first token of a streamed reply.
+        """
+        models = [kwargs["model"]]
+        if self.model not in models:
+            models.append(self.model)
+        models += [model for model in self.config.fallback_models if model not in models]
+        deadline = self.config.llm_request_deadline or None
+        last_error: Exception | None = None
+
+        try:
+            async with asyncio.timeout(deadline):
+                for model in models:
+                    request = {**kwargs, "model": model}
+
+                    for attempt in range(self.config.llm_max_retries + 1):
+                        try:
+                            self._last_request_at = time.monotonic()
+                            return await self._hedged(functools.partial(call, request))
+                        except Exception as e:
+                            last_error = e
+                            if isinstance(e, NotFoundError):
+                                break  # Model unavailable, go straight to the fallback
+                            if not _is_retryable(e):
+                                raise
+                            if attempt == self.config.llm_max_retries:
+                                break
+
+                            delay = self._retry_delay(attempt, e)
+                            logger.warning(
+                                f"LLM request to {model} failed ({e}), retrying in {delay:.1f}s"
+                            )
+                            await asyncio.sleep(delay)
+
+                    if model != models[-1]:
+                        logger.warning(f"Model {model} failed, falling back to the next model")
+        except TimeoutError:
+            raise LLMError(f"No response from the LLM within {deadline}s") from last_error
+
+        raise LLMError(f"LLM request failed: {last_error}") from last_error
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Backoff before the next attempt: Retry-After if given, else full jitter."""
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+                return min(retry_after, self.config.llm_retry_max_delay)
+            except (TypeError, ValueError):
+                pass
+
+        cap = min(self.config.llm_retry_max_delay, self.config.llm_retry_base_delay * 2**attempt)
+        return random.uniform(0, cap)
+
+    async def _hedged(self, call: Callable[[], Awaitable]):
+        """Await a call, sending a second identical one if the first is too slow.
+
+        Whichever returns first wins and the other is cancelled. This cuts off the
+        long tail of slow upstream responses at the cost of an occasional extra
+        request.
+        """
+        hedge_after = self.config.llm_hedge_after
+        if hedge_after <= 0:
+            return await call()
+
+        tasks = {asyncio.create_task(call())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                logger.info(f"No response after {hedge_after}s, sending a hedged request")
+                tasks.add(asyncio.create_task(call()))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                winner = None
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task
+                    else:
+                        await self._discard(task.result())
+                if winner is not None:
+                    return winner.result()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _create(self, kwargs: dict):
+        """Send a non-streamed request."""
+        return await self.client.chat.completions.create(**kwargs)
+
+    async def _open_stream(self, kwargs: dict) -> tuple:
+        """Open a streamed request and wait for its first chunk."""
+        stream = await self.client.chat.completions.create(**kwargs)
+        try:
+            first_chunk = await stream.__anext__()
+        except BaseException:
+            await stream.close()
+            raise
+        return first_chunk, stream
+
+    @staticmethod
+    async def _iter_stream(first_chunk, stream) -> AsyncIterator:
+        """Iterate over a stream whose first chunk has already been read."""
+        try:
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.close()
+
+    @staticmethod
+    async def _discard(result):
+        """Release a hedged response that lost the race."""
+        if isinstance(result, tuple):  # An open stream from _open_stream
+            await result[1].close()
+
+    async def close(self):
+        """Close the HTTP client and the response cache."""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            await asyncio.gather(self._keepalive_task, return_exceptions=True)
+            self._keepalive_task = None
 
-        return response.choices[0].message
+        await self.client.close()
+        if self.response_cache is not None:
+            logger.info(f"Response cache stats: {await self.response_cache.stats()}")
+            await self.response_cache.close()
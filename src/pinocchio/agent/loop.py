@@ -1,105 +1,287 @@
-import json
+import asyncio
 import logging
+import time
 
 from ..config import Settings
+from ..hardware.gpio import start_motion_watchers
 from ..tools.registry import ToolRegistry
 from ..utils.colors import Colors
-from .llm import LLMClient
+from ..utils.console import LineReader
+from .history import ConversationHistory
+from .intents import IntentMatcher
+from .llm import AssistantMessage, LLMClient, StreamEvent, ToolCall
+from .reactions import ReactionEngine
+from .router import ModelRouter, RoutingDecision
+from .scheduler import ToolScheduler
+from .summarizer import HistorySummarizer
 
 logger = logging.getLogger(__name__)
 
+QUIT_COMMANDS = ("quit", "exit", "bye")
+STOP_COMMANDS = ("stop", "cancel")
+# How tool results report failure (see the tools and ToolRegistry.execute)
+TOOL_FAILURES = ("❌", "Error")
+
 
 class AgentLoop:
     """Main autonomous agent control loop."""
 
-    def __init__(self, config: Settings):
-        self.llm = LLMClient(config)
-        self.tool_registry = ToolRegistry()
-        self.conversation_history: list[dict] = []
-        self.max_history = 20
+    def __init__(
+        self,
+        config: Settings,
+        llm: LLMClient | None = None,
+        tool_registry: ToolRegistry | None = None,
+    ):
+        self.config = config
+        # Sessions served by AgentServer share one client and one set of tools
+        self.llm = llm or LLMClient(config)
+        self.tool_registry = tool_registry or ToolRegistry()
+        self.conversation_history = ConversationHistory(
+            config.history_token_budget, system_message=self.llm.system_message
+        )
+        self.summarizer = None
+        if config.summarize_history:
+            self.summarizer = HistorySummarizer(
+                self.llm,
+                self.conversation_history,
+                model=config.summarizer_model or None,
+                max_words=config.summary_max_words,
+            )
+        self.intents = None
+        if config.intent_fast_path:
+            self.intents = IntentMatcher(self.tool_registry)
+        self.router = None
+        if config.router_enabled:
+            self.router = ModelRouter(config, self.llm, self.tool_registry)
+        self._reply_open = False  # Whether a "Pi-nocchio:" line is being printed
+        self._injected: asyncio.Queue[str] = asyncio.Queue()  # Prompts from reactions
 
     async def run(self):
         """Main text-based interaction loop."""
-        print(Colors.dim("Type 'quit' to exit") + "\n")
+        print(Colors.dim("Type 'quit' to exit, or 'stop' to interrupt a reply") + "\n")
 
         if not self.tool_registry.tools:
             print(Colors.yellow("⚠️  Warning: No tools are enabled. Check config/tools.yaml\n"))
 
-        while True:
-            try:
-                user_input = input(Colors.cyan("You: ")).strip()
-
-                if not user_input:
-                    continue
+        # Connect to the API now rather than on the first message
+        await self.llm.start()
+        # Follow the motion sensors from now on, so check_motion answers from memory
+        start_motion_watchers()
+        reactions = ReactionEngine.from_config(self.tool_registry, self.inject)
+        reactions.start()
 
-                if user_input.lower() in ["quit", "exit", "bye"]:
-                    print(
-                        "\n"
-                        + Colors.green("🤖 Pi-nocchio: ")
-                        + "Goodbye! I'll keep dreaming of being a real boy!\n"
-                    )
-                    break
+        reader = LineReader()
+        reader.start()
+        try:
+            await self._chat(reader)
+        finally:
+            reactions.stop()
+            reader.close()
+            await self.close()
 
-                self.conversation_history.append({"role": "user", "content": user_input})
+            logger.info(f"LLM token usage: {self.llm.usage_totals}")
+            await self.llm.close()
 
-                self._trim_history()
+    async def _chat(self, reader: LineReader):
+        """Read messages and answer them until the user leaves."""
+        next_input: str | None = None  # A message typed while the last turn was running
 
-                response_text = await self._agent_reasoning_loop()
+        while True:
+            if next_input is None:
+                print(Colors.cyan("You: "), end="", flush=True)
+                line = await self._next_line(reader)
+                user_input = "quit" if line is None else line.strip()
+            else:
+                user_input, next_input = next_input, None
 
-                print(f"\n{Colors.green('🤖 Pi-nocchio:')} {response_text}\n")
+            if not user_input or user_input.lower() in STOP_COMMANDS:
+                continue
 
-            except KeyboardInterrupt:
+            if user_input.lower() in QUIT_COMMANDS:
                 print(
-                    "\n\n"
+                    "\n"
                     + Colors.green("🤖 Pi-nocchio: ")
                     + "Goodbye! I'll keep dreaming of being a real boy!\n"
                 )
                 break
-            except Exception as e:
-                logger.error(f"Error in main loop: {e}")
-                print(f"\n{Colors.red('Error:')} {e}\n")
+
+            turn = asyncio.create_task(self.handle_message(user_input))
+            next_input = await self._wait_for_turn(turn, reader)
+
+    def inject(self, prompt: str):
+        """Queue an agent turn that was not typed by the user, such as a reaction to motion."""
+        self._injected.put_nowait(f"[Sensor event, not typed by {self.config.user_name}] {prompt}")
+
+    async def _next_line(self, reader: LineReader) -> str | None:
+        """Wait for the user's next line, or an injected prompt if one comes first."""
+        if not self._injected.empty():
+            return self._show_injected(self._injected.get_nowait())
+
+        read = asyncio.create_task(reader.readline())
+        injected = asyncio.create_task(self._injected.get())
+        try:
+            await asyncio.wait({read, injected}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            read.cancel()
+            injected.cancel()
+
+        if read.done() and not read.cancelled():
+            if injected.done() and not injected.cancelled():
+                self._injected.put_nowait(injected.result())  # Keep it for the next turn
+            return read.result()
+        return self._show_injected(injected.result())
+
+    def _show_injected(self, prompt: str) -> str:
+        print("\n" + Colors.magenta(f"⚡ {prompt}"))
+        return prompt
+
+    async def _wait_for_turn(self, turn: asyncio.Task, reader: LineReader) -> str | None:
+        """Show a turn's reply, or cancel the turn if the user types in the meantime.
+
+        "stop" cancels the turn and its pending tool calls. Any other message
+        cancels it too and is returned, to be answered next. Piped input is
+        never treated as an interruption.
+        """
+        if not reader.interactive:
+            await asyncio.wait({turn})
+            self._show_reply(turn)
+            return None
+
+        while True:
+            read = asyncio.create_task(reader.readline())
+            try:
+                await asyncio.wait({turn, read}, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                turn.cancel()
+                read.cancel()
+                raise
+
+            if turn.done():
+                read.cancel()
+                self._show_reply(turn)
+                return None
+
+            line = read.result()
+            user_input = "quit" if line is None else line.strip()
+            if not user_input:
+                continue
+
+            turn.cancel()
+            await asyncio.gather(turn, return_exceptions=True)
+            self._close_reply()
+            if user_input.lower() in STOP_COMMANDS:
+                print(Colors.dim("   ⏹️  Stopped") + "\n")
+                return None
+            return user_input
+
+    def _show_reply(self, turn: asyncio.Task):
+        """Print the outcome of a finished turn."""
+        try:
+            response_text = turn.result()
+        except Exception as e:
+            self._close_reply()
+            logger.error(f"Error in main loop: {e}")
+            print(f"\n{Colors.red('Error:')} {e}\n")
+            return
+
+        # Streamed replies have already been printed as they arrived
+        if not self._reply_open:
+            self._print_text(response_text)
+        self._close_reply()
+
+    async def handle_message(self, user_input: str) -> str:
+        """Run one user turn and return the reply."""
+        self.conversation_history.append({"role": "user", "content": user_input})
+
+        response_text = await self._run_intent(user_input)
+        if response_text is None:
+            response_text = await self._agent_reasoning_loop()
+
+        # Fold dropped turns into the summary while the user is typing
+        if self.summarizer is not None:
+            self.summarizer.start()
+
+        return response_text
+
+    async def close(self):
+        """Stop this conversation's background work."""
+        if self.summarizer is not None:
+            await self.summarizer.close()
+
+        if self.router is not None:
+            logger.info(f"Routing latency: {self.router.stats()}")
+
+    async def _run_intent(self, user_input: str) -> str | None:
+        """Run a simple command straight away without the model, if it matches a tool intent.
+
+        The exchange is recorded in the history as if the model had made the
+        tool call itself, so later turns see what happened. If the tool fails
+        the command goes to the model instead, which may read it differently.
+        """
+        if self.intents is None:
+            return None
+
+        tool_call = self.intents.match(user_input)
+        if tool_call is None:
+            return None
+
+        result = await self._execute_tool_call(tool_call)
+        if result.startswith(TOOL_FAILURES):
+            logger.debug(f"Intent {tool_call.name} failed ({result}), asking the model")
+            return None
+
+        self.conversation_history.append(AssistantMessage(None, [tool_call]).to_dict())
+        self.conversation_history.append(
+            {"role": "tool", "tool_call_id": tool_call.id, "content": result}
+        )
+        self.conversation_history.append({"role": "assistant", "content": result})
+        return result
 
     async def _agent_reasoning_loop(self) -> str:
         """Inner loop for agent reasoning with tool calls."""
-        while True:
-            response = await self.llm.chat_completion(
-                messages=self.conversation_history,
-                tools=self.tool_registry.get_tool_definitions(),
-            )
+        route: RoutingDecision | None = None
+        step = 0
 
-            if response.tool_calls:
-                for tool_call in response.tool_calls:
-                    logger.debug(f"Tool call: {tool_call.function.name}")
+        while True:
+            # Tool results grow the history mid-turn, so check the budget every step
+            dropped = self.conversation_history.trim()
+            if dropped and self.summarizer is not None:
+                self.summarizer.add(dropped)
 
-                    arguments = json.loads(tool_call.function.arguments)
+            # Once a turn has moved to the strong model it stays there
+            if self.router is not None and (route is None or route.route == RoutingDecision.FAST):
+                route = await self.router.route(self.conversation_history.messages, step)
+            model = route.model if route is not None else None
+            step += 1
 
-                    # Format arguments nicely
-                    args_str = ", ".join(f"{k}={v}" for k, v in arguments.items()) if arguments else "none"
-                    print(Colors.yellow(f"   🔧 Using tool: {tool_call.function.name}({args_str})"))
+            scheduler = ToolScheduler(self.tool_registry, self._execute_tool_call)
 
-                    result = await self.tool_registry.execute(
-                        tool_call.function.name, arguments
+            try:
+                started = time.monotonic()
+                if self.config.stream_responses:
+                    response, first_token = await self._stream_response(scheduler, model)
+                else:
+                    response = await self.llm.chat_completion(
+                        messages=self.conversation_history.messages,
+                        tools=self.tool_registry.get_tool_definitions(),
+                        model=model,
                     )
+                    first_token = time.monotonic()
+                    for tool_call in response.tool_calls:
+                        scheduler.submit(tool_call)
+                if route is not None:
+                    self.router.record(route, first_token - started, time.monotonic() - started)
 
-                    logger.debug(f"Tool result: {result}")
+                results = await scheduler.results()
+            except BaseException:
+                scheduler.cancel()
+                raise
 
-                    self.conversation_history.append(
-                        {
-                            "role": "assistant",
-                            "content": None,
-                            "tool_calls": [
-                                {
-                                    "id": tool_call.id,
-                                    "type": "function",
-                                    "function": {
-                                        "name": tool_call.function.name,
-                                        "arguments": tool_call.function.arguments,
-                                    },
-                                }
-                            ],
-                        }
-                    )
+            if response.tool_calls:
+                self.conversation_history.append(response.to_dict())
 
+                # Results are recorded in the order the model requested the calls
+                for tool_call, result in zip(response.tool_calls, results):
                     self.conversation_history.append(
                         {
                             "role": "tool",
@@ -117,7 +299,86 @@ class AgentLoop:
 
             return assistant_message
 
-    def _trim_history(self):
-        """Trim conversation history to prevent token overflow."""
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history :]
+    async def _stream_response(
+        self, scheduler: ToolScheduler, model: str | None = None
+    ) -> tuple[AssistantMessage, float]:
+        """Stream one model reply, printing text and starting tool calls as they complete.
+
+        Returns the full reply and the time its first event arrived.
+        """
+        started: set[int] = set()  # ids of tool calls already handed to the scheduler
+        first_token = None
+
+        async for event in self.llm.stream_chat_completion(
+            messages=self.conversation_history.messages,
+            tools=self.tool_registry.get_tool_definitions(),
+            model=model,
+        ):
+            if first_token is None:
+                first_token = time.monotonic()
+            if event.type == StreamEvent.CONTENT:
+                self._print_text(event.text)
+            elif event.type == StreamEvent.TOOL_CALL_DELTA:
+                if self._can_start_early(event.tool_call) and id(event.tool_call) not in started:
+                    logger.debug(f"Starting {event.tool_call.name} speculatively")
+                    started.add(id(event.tool_call))
+                    scheduler.submit(event.tool_call)
+            elif event.type == StreamEvent.TOOL_CALL:
+                if id(event.tool_call) not in started:
+                    started.add(id(event.tool_call))
+                    scheduler.submit(event.tool_call)
+            elif event.type == StreamEvent.DONE:
+                return event.message, first_token
+
+        raise RuntimeError("Stream ended without a final message")
+
+    def _can_start_early(self, tool_call: ToolCall) -> bool:
+        """Check whether a partially streamed tool call can already be started."""
+        if not self.config.speculative_tool_calls:
+            return False
+
+        tool = self.tool_registry.tools.get(tool_call.name)
+        if tool is None or not tool.speculative:
+            return False
+
+        # A JSON object is only complete once its closing brace has arrived
+        if not tool_call.arguments.rstrip().endswith("}"):
+            return False
+
+        return tool_call.parse_arguments() is not None
+
+    async def _execute_tool_call(self, tool_call: ToolCall) -> str:
+        """Execute a single tool call and return its result."""
+        logger.debug(f"Tool call: {tool_call.name}")
+
+        arguments = tool_call.parse_arguments()
+        if arguments is None:
+            return f"Error: Invalid arguments for {tool_call.name}: {tool_call.arguments}"
+
+        self._show_tool_call(tool_call.name, arguments)
+
+        result = await self.tool_registry.execute(tool_call.name, arguments)
+
+        logger.debug(f"Tool result: {result}")
+
+        return result
+
+    def _show_tool_call(self, name: str, arguments: dict):
+        """Tell the user which tool is being used."""
+        # Format arguments nicely
+        args_str = ", ".join(f"{k}={v}" for k, v in arguments.items()) if arguments else "none"
+        self._close_reply()
+        print(Colors.yellow(f"   🔧 Using tool: {name}({args_str})"))
+
+    def _print_text(self, text: str):
+        """Print reply text, opening a new reply line if needed."""
+        if not self._reply_open:
+            print(f"\n{Colors.green('🤖 Pi-nocchio:')} ", end="")
+            self._reply_open = True
+        print(text, end="", flush=True)
+
+    def _close_reply(self):
+        """Finish the reply line currently being printed, if any."""
+        if self._reply_open:
+            print("\n")
+            self._reply_open = False
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Callable
+
+from ..config import get_reactions_config
+from ..hardware.gpio import Priority, command_priority, get_event_bus
+from ..tools.registry import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"idle": Priority.IDLE, "normal": Priority.NORMAL, "alert": Priority.ALERT}
+
+
+class Reaction:
+    """One rule from config/reactions.yaml: an event, its limits and what to do."""
+
+    def __init__(self, name: str, config: dict):
+        self.name = name
+        self.event = config["event"]
+        self.source = config.get("source")  # None matches any device
+        self.debounce = float(config.get("debounce", 0))
+        self.cooldown = float(config.get("cooldown", 0))
+        self.max_per_hour = config.get("max_per_hour")
+        self.priority = PRIORITIES[config.get("priority", "normal")]
+
+        action = config["action"]
+        self.tool = action.get("tool")
+        self.arguments = action.get("arguments") or {}
+        self.prompt = action.get("prompt")
+        if not self.tool and not self.prompt:
+            raise ValueError("action needs a tool or a prompt")
+
+        self._last_event: float | None = None
+        self._fired: deque[float] = deque()  # Reaction times within the last hour
+
+    def matches(self, event: str, source: str) -> bool:
+        return event == self.event and self.source in (None, source)
+
+    def accept(self, at: float) -> bool:
+        """Apply debounce, cooldown and hourly limit to an event, recording it if it fires."""
+        last_event, self._last_event = self._last_event, at
+        if last_event is not None and at - last_event < self.debounce:
+            return False
+
+        while self._fired and at - self._fired[0] > 3600:
+            self._fired.popleft()
+        if self._fired and at - self._fired[-1] < self.cooldown:
+            return False
+        if self.max_per_hour is not None and len(self._fired) >= self.max_per_hour:
+            return False
+
+        self._fired.append(at)
+        return True
+
+
+class ReactionEngine:
+    """Runs reactions to hardware events from the event bus.
+
+    A reaction either runs a tool directly, which takes milliseconds and no
+    model request, or hands a prompt to `inject` to start an agent turn.
+    Nothing runs, and nothing is spent on the model, while no events arrive.
+    """
+
+    def __init__(
+        self,
+        reactions: list[Reaction],
+        tool_registry: ToolRegistry,
+        inject: Callable[[str], None] | None = None,
+    ):
+        self.reactions = reactions
+        self.tool_registry = tool_registry
+        self.inject = inject
+        self._tasks: set[asyncio.Task] = set()
+        self._stop_listening: Callable[[], None] | None = None
+
+    @classmethod
+    def from_config(
+        cls, tool_registry: ToolRegistry, inject: Callable[[str], None] | None = None
+    ) -> "ReactionEngine":
+        """Build the engine from the enabled rules in config/reactions.yaml."""
+        reactions = []
+        for name, config in get_reactions_config().get("reactions", {}).items():
+            if not config.get("enabled", False):
+                logger.debug(f"Reaction {name} is disabled in config")
+                continue
+            try:
+                reactions.append(Reaction(name, config))
+                logger.info(f"Loaded reaction: {name}")
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Invalid reaction {name}: {e}")
+        return cls(reactions, tool_registry, inject)
+
+    def start(self):
+        """Start reacting to events."""
+        if self.reactions and self._stop_listening is None:
+            self._stop_listening = get_event_bus().listen(self._on_event)
+
+    def stop(self):
+        """Stop reacting and cancel reactions still running."""
+        if self._stop_listening is not None:
+            self._stop_listening()
+            self._stop_listening = None
+        for task in self._tasks:
+            task.cancel()
+
+    def _on_event(self, event: str, source: str, at: float):
+        for reaction in self.reactions:
+            if not reaction.matches(event, source) or not reaction.accept(at):
+                continue
+
+            delay = (asyncio.get_running_loop().time() - at) * 1000
+            logger.info(f"Reaction {reaction.name} to {event} from {source} ({delay:.1f} ms)")
+
+            if reaction.tool:
+                task = asyncio.create_task(self._run_tool(reaction))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            elif self.inject is not None:
+                self.inject(reaction.prompt)
+            else:
+                logger.warning(f"Reaction {reaction.name} needs an agent to send its prompt to")
+
+    async def _run_tool(self, reaction: Reaction):
+        # Devices are leased at the rule's priority, so alerts interrupt idle animations
+        command_priority.set(reaction.priority)
+        result = await self.tool_registry.execute(reaction.tool, reaction.arguments)
+        logger.info(f"Reaction {reaction.name}: {result}")
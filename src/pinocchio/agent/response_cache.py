@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Local cache of LLM responses for requests that have been seen before.
+
+    Keys are a hash of the canonical request (model, messages, tools and
+    sampling parameters), so only byte-for-byte identical requests hit. A small
+    in-memory LRU sits in front of a SQLite store that survives restarts. Entries
+    expire after `ttl` seconds and the store keeps at most `max_entries`, evicting
+    the least recently used.
+
+    The store lives on its own worker thread, so lookups that miss memory and
+    writes (with their commits) never stall the event loop. Access times are
+    only committed along with the next stored response.
+    """
+
+    def __init__(self, path: Path | None, ttl: float, max_entries: int, memory_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache")
+            self._executor.submit(self._open, path)
+
+    @staticmethod
+    def make_key(request: dict) -> str:
+        """Hash a request into a cache key, independent of dict ordering."""
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    async def get(self, key: str) -> dict | None:
+        """Return the cached response for the key, or None on a miss."""
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            created, value = entry
+            if now - created <= self.ttl:
+                self._memory.move_to_end(key)
+                if self._executor is not None:
+                    # Keep the stored LRU order in step, so hot entries are not evicted
+                    self._executor.submit(self._touch, key, now)
+                self.hits += 1
+                return value
+            del self._memory[key]
+
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            row = await loop.run_in_executor(self._executor, self._load, key, now)
+            if row is not None:
+                created, value = row
+                self._remember(key, created, value)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: dict):
+        """Store a response under the key, writing it to disk in the background."""
+        now = time.time()
+        self._remember(key, now, value)
+
+        if self._executor is not None:
+            self._executor.submit(self._store, key, json.dumps(value), now)
+
+    async def stats(self) -> dict:
+        """Hit/miss counters and current sizes."""
+        stored = 0
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            stored = await loop.run_in_executor(self._executor, self._count)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "stored_entries": stored,
+        }
+
+    async def close(self):
+        """Commit pending writes and close the database connection."""
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._close)
+            self._executor.shutdown()
+            self._executor = None
+
+    def _remember(self, key: str, created: float, value: dict):
+        """Add a response to the in-memory LRU."""
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # The methods below run on the worker thread, which owns the connection
+
+    def _open(self, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Response cache database unavailable, using memory only: {e}")
+            self._db = None
+
+    def _load(self, key: str, now: float) -> tuple[float, dict] | None:
+        """Read an unexpired entry, marking it as used."""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return row[1], json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+
+    def _touch(self, key: str, now: float):
+        """Mark an entry as used, committed with the next write."""
+        if self._db is None:
+            return
+        try:
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache update failed: {e}")
+
+    def _store(self, key: str, value: str, now: float):
+        """Write an entry and evict, in one commit."""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            # Drop expired entries, then the least recently used ones beyond the limit
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write response cache entry: {e}")
+
+    def _count(self) -> int:
+        if self._db is None:
+            return 0
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _close(self):
+        if self._db is not None:
+            try:
+                self._db.commit()
+            finally:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import re
+import statistics
+from collections import deque
+
+from ..config import Settings
+from ..tools.registry import ToolRegistry
+from .llm import LLMClient
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_PROMPT = """You route requests for a voice assistant living in a Raspberry Pi \
+with LEDs, a buzzer and a motion sensor. Reply FAST if the request is a simple command or \
+question (switching hardware, telling the time, small talk), or STRONG if it needs \
+reasoning, planning, creativity or a long answer. Reply with the single word only."""
+
+# Words that suggest a turn needs more than a quick hardware action
+STRONG_KEYWORDS = {
+    "why",
+    "explain",
+    "how",
+    "story",
+    "poem",
+    "plan",
+    "think",
+    "write",
+    "compare",
+    "remember",
+    "describe",
+}
+
+
+class RoutingDecision:
+    """Which model a request goes to, and why."""
+
+    FAST = "fast"
+    STRONG = "strong"
+
+    def __init__(self, route: str, model: str, reason: str):
+        self.route = route
+        self.model = model
+        self.reason = reason
+
+
+class ModelRouter:
+    """Sends simple turns to a fast model and everything else to `model_name`.
+
+    Short commands that mention the hardware ("turn on the green LED") and
+    short remarks go to `fast_model_name`. Long or open-ended messages,
+    questions that name no hardware, and turns whose tool loop runs deeper
+    than `router_max_fast_steps`, go to the strong model. In
+    classifier mode the fast model itself is asked to pick, with the
+    heuristics as a fallback. Every decision is logged, along with the
+    first-token and total latency of each route.
+    """
+
+    def __init__(self, config: Settings, llm: LLMClient, tool_registry: ToolRegistry):
+        self.config = config
+        self.llm = llm
+        self.fast_model = config.fast_model_name
+        self.strong_model = config.model_name
+        # Hardware words taken from the tool names, e.g. "led" from toggle_led
+        self.tool_words = {
+            word for name in tool_registry.tools for word in name.split("_") if len(word) > 2
+        }
+        self._latencies = {
+            route: {"first_token": deque(maxlen=100), "total": deque(maxlen=100)}
+            for route in (RoutingDecision.FAST, RoutingDecision.STRONG)
+        }
+
+    async def route(self, messages: list[dict], step: int) -> RoutingDecision:
+        """Pick the model for the next request of a turn (`step` counts tool-loop rounds)."""
+        text = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        if not isinstance(text, str):
+            text = ""
+
+        if step >= self.config.router_max_fast_steps:
+            decision = self._strong(f"tool loop reached step {step}")
+        elif self.config.router_mode == "classifier" and step == 0:
+            decision = await self._classify(text)
+        else:
+            decision = self._heuristic(text)
+
+        logger.debug(f"Routing to {decision.route} model {decision.model} ({decision.reason})")
+        return decision
+
+    def record(self, decision: RoutingDecision, first_token: float, total: float):
+        """Record the latency of a routed request, in seconds."""
+        latencies = self._latencies[decision.route]
+        latencies["first_token"].append(first_token)
+        latencies["total"].append(total)
+        logger.debug(
+            f"{decision.route} model {decision.model}: first token {first_token:.2f}s, "
+            f"total {total:.2f}s"
+        )
+
+    def stats(self) -> dict:
+        """Request count and median latencies per route."""
+        stats = {}
+        for route, latencies in self._latencies.items():
+            if latencies["total"]:
+                stats[route] = {
+                    "requests": len(latencies["total"]),
+                    "median_first_token": round(statistics.median(latencies["first_token"]), 3),
+                    "median_total": round(statistics.median(latencies["total"]), 3),
+                }
+        return stats
+
+    def _heuristic(self, text: str) -> RoutingDecision:
+        """Route on message length and wording."""
+        if len(text) > self.config.router_fast_max_chars:
+            return self._strong(f"{len(text)} characters")
+
+        words = set(re.findall(r"[a-z]+", text.lower()))
+        if words & STRONG_KEYWORDS:
+            return self._strong(f"asks to {'/'.join(sorted(words & STRONG_KEYWORDS))}")
+        if words & self.tool_words:
+            return self._fast("short hardware request")
+        # A question no tool can answer is one the model has to think about
+        if "?" in text:
+            return self._strong("question without a hardware action")
+        return self._fast("short message")
+
+    async def _classify(self, text: str) -> RoutingDecision:
+        """Ask the fast model to route, falling back to the heuristics."""
+        try:
+            async with asyncio.timeout(self.config.router_classifier_timeout):
+                response = await self.llm.chat_completion(
+                    messages=[{"role": "user", "content": text}],
+                    model=self.fast_model,
+                    system_prompt=CLASSIFIER_PROMPT,
+                )
+        except Exception as e:
+            logger.warning(f"Routing classifier failed ({e}), using heuristics")
+            return self._heuristic(text)
+
+        answer = (response.content or "").strip().upper()
+        if answer.startswith("FAST"):
+            return self._fast("classifier")
+        if answer.startswith("STRONG"):
+            return self._strong("classifier")
+
+        logger.warning(f"Unexpected routing classifier answer {answer!r}, using heuristics")
+        return self._heuristic(text)
+
+    def _fast(self, reason: str) -> RoutingDecision:
+        return RoutingDecision(RoutingDecision.FAST, self.fast_model, reason)
+
+    def _strong(self, reason: str) -> RoutingDecision:
+        return RoutingDecision(RoutingDecision.STRONG, self.strong_model, reason)
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from ..tools.registry import ToolRegistry
+from .llm import ToolCall
+
+logger = logging.getLogger(__name__)
+
+
+class ToolScheduler:
+    """Runs the tool calls of one assistant turn concurrently where the hardware allows.
+
+    Each call waits only for earlier calls that need one of the same hardware
+    resources (see `BaseTool.resources`), so a `speak` and a `blink_emotion` run
+    side by side while two buzzer tools still play one after another. Barrier
+    tools such as `wait` keep their place in the sequence.
+    """
+
+    def __init__(
+        self,
+        tool_registry: ToolRegistry,
+        runner: Callable[[ToolCall], Awaitable[str]],
+    ):
+        self.tool_registry = tool_registry
+        self._runner = runner
+        self._tasks: list[asyncio.Task] = []
+        self._last_by_resource: dict[str, asyncio.Task] = {}
+        self._last_barrier: asyncio.Task | None = None
+
+    def submit(self, tool_call: ToolCall) -> asyncio.Task:
+        """Schedule a tool call to start as soon as the calls it conflicts with are done."""
+        tool = self.tool_registry.tools.get(tool_call.name)
+        resources = tool.resources if tool else ()
+        is_barrier = tool.barrier if tool else False
+
+        if is_barrier:
+            depends_on = list(self._tasks)
+        else:
+            depends_on = [
+                self._last_by_resource[resource]
+                for resource in resources
+                if resource in self._last_by_resource
+            ]
+            if self._last_barrier is not None:
+                depends_on.append(self._last_barrier)
+
+        task = asyncio.create_task(self._run_after(depends_on, tool_call))
+        self._tasks.append(task)
+
+        if is_barrier:
+            self._last_barrier = task
+        for resource in resources:
+            self._last_by_resource[resource] = task
+
+        logger.debug(
+            f"Scheduled {tool_call.name} (resources={list(resources)}, "
+            f"waiting on {len(depends_on)} call(s))"
+        )
+        return task
+
+    async def results(self) -> list[str]:
+        """Wait for every submitted call and return the results in submission order."""
+        return list(await asyncio.gather(*self._tasks))
+
+    def cancel(self):
+        """Cancel every call that has not finished yet."""
+        for task in self._tasks:
+            task.cancel()
+
+    async def _run_after(self, depends_on: list[asyncio.Task], tool_call: ToolCall) -> str:
+        """Run a tool call once the calls it depends on have finished."""
+        if depends_on:
+            await asyncio.wait(depends_on)
+        return await self._runner(tool_call)
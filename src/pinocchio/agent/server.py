@@ -0,0 +1,324 @@
+import asyncio
+import json
+import logging
+import re
+import time
+
+from ..config import Settings
+from ..hardware.gpio import start_motion_watchers
+from ..tools.registry import ToolRegistry
+from .llm import LLMClient
+from .loop import AgentLoop
+from .reactions import ReactionEngine
+
+logger = logging.getLogger(__name__)
+
+SESSION_PATH = re.compile(r"/sessions/(?P<session_id>[\w.-]{1,64})(?P<messages>/messages)?")
+MAX_BODY_BYTES = 64 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """An error response to send back to the client."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ServerSession(AgentLoop):
+    """One client's conversation, with output sent to a queue instead of the terminal."""
+
+    def __init__(self, session_id: str, config: Settings, llm: LLMClient, registry: ToolRegistry):
+        super().__init__(config, llm=llm, tool_registry=registry)
+        self.session_id = session_id
+        self.lock = asyncio.Lock()  # One turn at a time per conversation
+        self.last_active = time.monotonic()
+        self.events: asyncio.Queue | None = None
+
+    def _show_tool_call(self, name: str, arguments: dict):
+        self._emit({"type": "tool", "name": name, "arguments": arguments})
+
+    def _print_text(self, text: str):
+        self._emit({"type": "text", "text": text})
+
+    def _close_reply(self):
+        pass
+
+    def _emit(self, event: dict):
+        if self.events is not None:
+            self.events.put_nowait(event)
+
+
+class AgentServer:
+    """Serves many conversations at once over a small HTTP API.
+
+    Every client has its own session (history, summary, routing) while all of
+    them share one tool registry and one pooled LLM client. Replies stream
+    back as newline-delimited JSON over a chunked response:
+
+        POST   /sessions/<id>/messages   {"message": "..."}  -> stream of events
+        GET    /sessions                                     -> open sessions
+        DELETE /sessions/<id>                                -> end a session
+
+    Sessions are created on their first message and dropped after
+    `server_session_ttl` idle seconds.
+    """
+
+    def __init__(self, config: Settings):
+        self.config = config
+        self.llm = LLMClient(config)
+        self.tool_registry = ToolRegistry()
+        self.sessions: dict[str, ServerSession] = {}
+        self._reaction_turns: set[asyncio.Task] = set()
+
+    async def serve(self):
+        """Run the server until cancelled."""
+        await self.llm.start()
+        start_motion_watchers()
+        reactions = ReactionEngine.from_config(self.tool_registry, self._inject)
+        reactions.start()
+
+        server = await asyncio.start_server(
+            self._handle_connection, self.config.server_host, self.config.server_port
+        )
+        expiry_task = asyncio.create_task(self._expire_sessions())
+        logger.info(f"Serving on http://{self.config.server_host}:{self.config.server_port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reactions.stop()
+            expiry_task.cancel()
+            for task in self._reaction_turns:
+                task.cancel()
+            for session in list(self.sessions.values()):
+                await session.close()
+            self.sessions.clear()
+            logger.info(f"LLM token usage: {self.llm.usage_totals}")
+            await self.llm.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle one HTTP request, then close the connection."""
+        try:
+            try:
+                async with asyncio.timeout(10):
+                    method, path, headers, body = await self._read_request(reader)
+                await self._dispatch(method, path, headers, body, reader, writer)
+            except HTTPError as e:
+                await self._send_json(writer, e.status, {"error": str(e)})
+            except TimeoutError:
+                await self._send_json(writer, 400, {"error": "Request not received in time"})
+        except ConnectionError:
+            logger.debug("Client disconnected")
+        except Exception as e:
+            logger.error(f"Error handling request: {e}")
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple[str, str, dict, bytes]:
+        """Parse the request line, headers and body."""
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _dispatch(
+        self,
+        method: str,
+        path: str,
+        headers: dict,
+        body: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        """Route a request to its handler."""
+        token = self.config.server_token
+        if token and headers.get("authorization") != f"Bearer {token}":
+            raise HTTPError(401, "Missing or wrong bearer token")
+
+        if path == "/sessions":
+            if method != "GET":
+                raise HTTPError(405, f"{method} not allowed on {path}")
+            now = time.monotonic()
+            sessions = [
+                {
+                    "session_id": session.session_id,
+                    "messages": len(session.conversation_history),
+                    "idle_seconds": round(now - session.last_active),
+                }
+                for session in self.sessions.values()
+            ]
+            await self._send_json(writer, 200, {"sessions": sessions})
+            return
+
+        match = SESSION_PATH.fullmatch(path)
+        if match is None:
+            raise HTTPError(404, f"No such endpoint {path}")
+        session_id = match["session_id"]
+
+        if match["messages"] and method == "POST":
+            await self._handle_message(session_id, body, reader, writer)
+        elif not match["messages"] and method == "DELETE":
+            session = self.sessions.pop(session_id, None)
+            if session is None:
+                raise HTTPError(404, f"No session {session_id}")
+            await session.close()
+            await self._send_json(writer, 200, {"deleted": session_id})
+        else:
+            raise HTTPError(405, f"{method} not allowed on {path}")
+
+    async def _handle_message(
+        self,
+        session_id: str,
+        body: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        """Run a turn in a session and stream its events back.
+
+        The turn, with its pending tool calls, is cancelled as soon as the
+        client closes the connection.
+        """
+        try:
+            message = json.loads(body)["message"].strip()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise HTTPError(400, 'Expected a JSON body like {"message": "..."}')
+        if not message:
+            raise HTTPError(400, "Empty message")
+
+        session = self._get_session(session_id)
+
+        async with session.lock:
+            session.last_active = time.monotonic()
+            events = session.events = asyncio.Queue()
+            turn = asyncio.create_task(session.handle_message(message))
+            turn.add_done_callback(lambda _: events.put_nowait(None))
+            watcher = asyncio.create_task(self._cancel_on_disconnect(reader, turn))
+
+            await self._start_stream(writer)
+            try:
+                while (event := await events.get()) is not None:
+                    await self._send_chunk(writer, event)
+
+                if turn.cancelled():
+                    logger.info(f"Client of session {session_id} disconnected, turn cancelled")
+                    return
+                if (error := turn.exception()) is not None:
+                    logger.error(f"Error in session {session_id}: {error}")
+                    await self._send_chunk(writer, {"type": "error", "error": str(error)})
+                else:
+                    await self._send_chunk(writer, {"type": "done", "reply": turn.result()})
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+            finally:
+                watcher.cancel()
+                # Sending to the client failed mid-turn: stop the turn and its tool calls
+                if not turn.done():
+                    turn.cancel()
+                    await asyncio.gather(turn, return_exceptions=True)
+                session.events = None
+                session.last_active = time.monotonic()
+
+    @staticmethod
+    async def _cancel_on_disconnect(reader: asyncio.StreamReader, turn: asyncio.Task):
+        """Cancel a turn when its client hangs up, rather than at the next write."""
+        try:
+            while await reader.read(1024):
+                pass  # Nothing more is expected from the client after its request
+        except ConnectionError:
+            pass
+        turn.cancel()
+
+    def _inject(self, prompt: str):
+        """Run a reaction's prompt as a turn of the "reactions" session."""
+        task = asyncio.create_task(self._reaction_turn(prompt))
+        self._reaction_turns.add(task)
+        task.add_done_callback(self._reaction_turns.discard)
+
+    async def _reaction_turn(self, prompt: str):
+        try:
+            session = self._get_session("reactions")
+            async with session.lock:
+                session.last_active = time.monotonic()
+                reply = await session.handle_message(f"[Sensor event] {prompt}")
+            logger.info(f"Reaction turn: {reply}")
+        except Exception as e:
+            logger.error(f"Reaction turn failed: {e}")
+
+    def _get_session(self, session_id: str) -> ServerSession:
+        """Return a session, creating it on first use."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            if len(self.sessions) >= self.config.server_max_sessions:
+                raise HTTPError(503, "Too many open sessions")
+            session = ServerSession(session_id, self.config, self.llm, self.tool_registry)
+            self.sessions[session_id] = session
+            logger.info(f"Started session {session_id}")
+        return session
+
+    async def _expire_sessions(self):
+        """Drop sessions that have been idle for longer than the TTL."""
+        ttl = self.config.server_session_ttl
+        while True:
+            await asyncio.sleep(min(ttl, 60))
+            cutoff = time.monotonic() - ttl
+            for session_id, session in list(self.sessions.items()):
+                if session.last_active < cutoff and not session.lock.locked():
+                    del self.sessions[session_id]
+                    await session.close()
+                    logger.info(f"Session {session_id} expired")
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: int, body: dict):
+        """Send a complete JSON response."""
+        data = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode()
+            + data
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _start_stream(writer: asyncio.StreamWriter):
+        """Send the headers of a chunked newline-delimited JSON response."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _send_chunk(writer: asyncio.StreamWriter, event: dict):
+        """Send one event as a line of JSON in its own chunk."""
+        data = json.dumps(event).encode() + b"\n"
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+
+from .history import ConversationHistory
+from .llm import LLMClient
+
+logger = logging.getLogger(__name__)
+
+SUMMARIZER_PROMPT = """You maintain the running memory of a conversation between a user and \
+an AI assistant living in a Raspberry Pi. Update the summary with the new turns below.
+Keep facts about the user, their preferences, decisions made, open requests and anything \
+the assistant promised. Drop small talk. Reply with the updated summary only, in at most \
+{max_words} words."""
+
+
+class HistorySummarizer:
+    """Folds turns dropped from the history into a compact running summary.
+
+    Summarizing runs as a background task between user turns, so it never adds
+    latency to a reply. The latest summary is written into the history as soon
+    as it is ready and is sent with the following requests.
+    """
+
+    def __init__(
+        self,
+        llm: LLMClient,
+        history: ConversationHistory,
+        model: str | None = None,
+        max_words: int = 150,
+    ):
+        self.llm = llm
+        self.history = history
+        self.model = model
+        self.max_words = max_words
+        self.summary = ""
+        self._pending: list[dict] = []
+        self._task: asyncio.Task | None = None
+
+    def add(self, messages: list[dict]):
+        """Queue dropped messages to be folded into the summary."""
+        self._pending.extend(messages)
+
+    def start(self):
+        """Summarize queued messages in the background, unless that is already happening."""
+        if self._pending and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._summarize())
+
+    async def close(self):
+        """Stop any summary still in progress."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _summarize(self):
+        """Fold queued messages into the summary until none are left."""
+        while self._pending:
+            messages, self._pending = self._pending, []
+
+            prompt = (
+                f"Current summary:\n{self.summary or '(none yet)'}\n\n"
+                f"New turns:\n{self._render(messages)}"
+            )
+
+            try:
+                response = await self.llm.chat_completion(
+                    messages=[{"role": "user", "content": prompt}],
+                    model=self.model,
+                    system_prompt=SUMMARIZER_PROMPT.format(max_words=self.max_words),
+                )
+            except Exception as e:
+                logger.warning(f"Could not summarize history, will retry later: {e}")
+                self._pending = messages + self._pending
+                return
+
+            if response.content:
+                self.summary = response.content.strip()
+                self.history.set_summary(self.summary)
+                logger.debug(f"Updated history summary: {self.summary}")
+
+    @staticmethod
+    def _render(messages: list[dict]) -> str:
+        """Render messages as a plain transcript for the summarizer model."""
+        lines = []
+        for message in messages:
+            role = message["role"]
+            if role == "user":
+                lines.append(f"User: {message['content']}")
+            elif role == "tool":
+                lines.append(f"Tool result: {message['content']}")
+            elif role == "assistant":
+                for tool_call in message.get("tool_calls") or []:
+                    function = tool_call["function"]
+                    lines.append(f"Assistant used {function['name']}({function['arguments']})")
+                if message.get("content"):
+                    lines.append(f"Assistant: {message['content']}")
+        return "\n".join(lines)
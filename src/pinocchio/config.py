@@ -1,19 +1,87 @@
 from pathlib import Path
 
 import yaml
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     """Main application settings loaded from environment variables."""
 
-    openrouter_api_key: str
+    openrouter_api_key: str = ""
     model_name: str = "anthropic/claude-3.5-sonnet"
     app_url: str = "https://github.com/hr23232323/pi-nocchio"
+    stream_responses: bool = True  # Print replies token by token as they arrive
+    speculative_tool_calls: bool = False  # Start safe tools before the reply finishes streaming
+    intent_fast_path: bool = False  # Run simple commands ("what time is it") without the model
+    prompt_caching: bool = False  # Send cache_control breakpoints (Anthropic models on OpenRouter)
+
+    # LLM backend: "openrouter", "openai" (any OpenAI-compatible server) or "fake"
+    llm_backend: str = "openrouter"
+    llm_base_url: str = ""  # Defaults to OpenRouter, e.g. http://192.168.1.20:8080/v1 for a LAN box
+    llm_api_key: str = ""  # Defaults to openrouter_api_key
+    fake_llm_script: str = "config/fake_llm.yaml"  # Scripted replies for the fake backend
+    fake_llm_latency: float = 0.0  # Seconds before the fake backend's first token
+    fake_llm_token_interval: float = 0.0  # Seconds between the fake backend's tokens
+
+    # Model routing: simple turns go to a fast model, everything else to model_name
+    router_enabled: bool = False
+    fast_model_name: str = "anthropic/claude-3.5-haiku"
+    router_mode: str = "heuristic"  # Or "classifier", which asks fast_model_name to pick
+    router_fast_max_chars: int = 120  # Longer messages go to model_name
+    router_max_fast_steps: int = 3  # Tool-loop rounds before a turn moves to model_name
+    router_classifier_timeout: float = 2.0  # Seconds, then the heuristics decide
+
+    # Server mode (python -m pinocchio --serve), one session per client
+    server_host: str = "127.0.0.1"  # 0.0.0.0 to accept other devices on the network
+    server_port: int = 8765
+    server_token: str = ""  # Clients must send "Authorization: Bearer <token>" if set
+    server_max_sessions: int = 20
+    server_session_ttl: float = 3600  # Idle seconds before a session is dropped
+
+    # HTTP transport to the LLM API
+    http_max_connections: int = 10
+    http_max_keepalive_connections: int = 5
+    http_keepalive_expiry: float = 300  # Seconds an idle pooled connection stays open
+    http2: bool = False  # Needs the h2 package (pip install 'httpx[http2]')
+    http_connect_timeout: float = 10
+    http_read_timeout: float = 60
+    llm_keepalive_interval: float = 60  # Ping the API after this many idle seconds, 0 disables
+
+    # Retries, hedging and fallbacks for LLM requests
+    llm_max_retries: int = 3  # Per model, on rate limits, 5xx and network errors
+    llm_retry_base_delay: float = 0.5  # Seconds, doubled after every attempt
+    llm_retry_max_delay: float = 8.0
+    llm_request_deadline: float = 90  # Seconds for a whole request with retries, 0 disables
+    llm_hedge_after: float = 0  # Send a second request if the first is this slow, 0 disables
+    fallback_models: list[str] = []  # Tried in order when model_name keeps failing
+
+    # Local cache of LLM responses, for replaying fixed prompts without the network
+    response_cache_enabled: bool = False
+    response_cache_path: str = "~/.cache/pinocchio/responses.sqlite3"
+    response_cache_ttl: float = 86400  # Seconds
+    response_cache_max_entries: int = 1000
+    response_cache_memory_entries: int = 100
+
+    # Conversation history, with a rolling summary of the turns dropped from it
+    history_token_budget: int = 8000  # Oldest turns are dropped beyond this many tokens
+    summarize_history: bool = True
+    summarizer_model: str = ""  # Defaults to model_name, a cheaper model works well
+    summary_max_words: int = 150
+
+    # GPIO
+    gpio_backend: str = "hardware"  # Or "simulated": recorded mock pins, no Raspberry Pi needed
 
     # Piper TTS (local text-to-speech)
     piper_voice: str = "en_US-lessac-medium"  # Default voice model
     piper_model_path: str = "~/.local/share/piper/voices"  # Where voice models are stored
+    piper_length_scale: float = 1.0  # Speaking speed, higher is slower
+
+    # Speech audio cache (repeated phrases skip synthesis)
+    speech_cache_enabled: bool = True
+    speech_cache_dir: str = "~/.cache/pinocchio/speech"
+    speech_cache_memory_mb: int = 16
+    speech_cache_disk_mb: int = 200
 
     # Personalization
     user_name: str = "Friend"
@@ -23,6 +91,12 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
 
+    @model_validator(mode="after")
+    def _check_api_key(self):
+        if self.llm_backend == "openrouter" and not (self.openrouter_api_key or self.llm_api_key):
+            raise ValueError("OPENROUTER_API_KEY is required for the openrouter backend")
+        return self
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -49,3 +123,14 @@ def get_tools_config() -> dict:
 
     with open(config_path) as f:
         return yaml.safe_load(f) or {"tools": {}}
+
+
+def get_reactions_config() -> dict:
+    """Load hardware event reactions from config/reactions.yaml."""
+    config_path = Path("config/reactions.yaml")
+
+    if not config_path.exists():
+        return {"reactions": {}}
+
+    with open(config_path) as f:
+        return yaml.safe_load(f) or {"reactions": {}}
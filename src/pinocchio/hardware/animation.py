@@ -0,0 +1,185 @@
+"""Precomputed LED and buzzer animations, played against the event loop clock.
+
+A pattern (blink, pulse, melody, beep pattern, morse code) is compiled once
+into a `Timeline`: the value a device should have at each offset from the
+start. `play()` then schedules every step against one anchor time instead of
+chaining sleeps, so timing errors never accumulate, and it only ever awaits,
+so animations on different devices run side by side without blocking the loop.
+"""
+
+import asyncio
+import logging
+
+from gpiozero import PWMLED, TonalBuzzer
+
+logger = logging.getLogger(__name__)
+
+# Musical note frequencies (in Hz) for melodies
+NOTES = {
+    "C4": 261.63,
+    "D4": 293.66,
+    "E4": 329.63,
+    "F4": 349.23,
+    "G4": 392.00,
+    "A4": 440.00,
+    "B4": 493.88,
+    "C5": 523.25,
+    "D5": 587.33,
+    "E5": 659.25,
+    "F5": 698.46,
+    "G5": 783.99,
+    "A5": 880.00,
+    "REST": 0,  # Silence/rest
+}
+
+# Beep pattern elements: (seconds of sound, seconds of silence after it)
+BEEPS = {
+    "short": (0.15, 0.1),
+    "long": (0.5, 0.1),
+    "pause": (0.0, 0.3),
+}
+
+MORSE = {
+    "a": ".-", "b": "-...", "c": "-.-.", "d": "-..", "e": ".", "f": "..-.", "g": "--.",
+    "h": "....", "i": "..", "j": ".---", "k": "-.-", "l": ".-..", "m": "--", "n": "-.",
+    "o": "---", "p": ".--.", "q": "--.-", "r": ".-.", "s": "...", "t": "-", "u": "..-",
+    "v": "...-", "w": ".--", "x": "-..-", "y": "-.--", "z": "--..",
+    "0": "-----", "1": ".----", "2": "..---", "3": "...--", "4": "....-",
+    "5": ".....", "6": "-....", "7": "--...", "8": "---..", "9": "----.",
+}  # fmt: skip
+
+
+class Timeline:
+    """The values a device takes at fixed offsets from the start of an animation.
+
+    Values are LED brightness (0 to 1) or buzzer frequency in Hz (0 is silence).
+    """
+
+    def __init__(self, steps: list[tuple[float, float]], duration: float):
+        self.steps = steps  # (seconds from start, value), in time order
+        self.duration = duration
+
+
+def blink(times: int, on_time: float, off_time: float) -> Timeline:
+    """Switch on and off `times` times, ending off."""
+    period = on_time + off_time
+    steps = []
+    for i in range(int(times)):
+        steps.append((i * period, 1.0))
+        steps.append((i * period + on_time, 0.0))
+    return Timeline(steps, int(times) * period)
+
+
+def pulse(fade_in: float, fade_out: float, times: int, fps: int = 50) -> Timeline:
+    """Fade up and down `times` times, in brightness steps `fps` times a second."""
+    steps = []
+    period = fade_in + fade_out
+    for i in range(int(times)):
+        start = i * period
+        rise = max(1, round(fade_in * fps))
+        fall = max(1, round(fade_out * fps))
+        steps += [(start + fade_in * n / rise, n / rise) for n in range(rise)]
+        steps += [(start + fade_in + fade_out * n / fall, 1 - n / fall) for n in range(fall)]
+    steps.append((int(times) * period, 0.0))
+    return Timeline(steps, int(times) * period)
+
+
+def melody(notes: list[str], note_duration: float) -> Timeline:
+    """Play note names from NOTES one after another, then stop."""
+    steps = []
+    for i, note in enumerate(notes):
+        if note.upper() not in NOTES:
+            raise ValueError(f"Unknown note '{note}'. Available: {', '.join(NOTES)}")
+        steps.append((i * note_duration, NOTES[note.upper()]))
+    steps.append((len(notes) * note_duration, 0.0))
+    return Timeline(steps, len(notes) * note_duration)
+
+
+def beep_pattern(pattern: str, frequency: float) -> Timeline:
+    """Compile a pattern like 'short-short-long' or 'long-pause-short' of BEEPS."""
+    steps = []
+    at = 0.0
+    for part in pattern.lower().split("-"):
+        part = part.strip()
+        if part not in BEEPS:
+            raise ValueError(f"Unknown pattern element '{part}'. Use: short, long, pause")
+        sound, silence = BEEPS[part]
+        if sound:
+            steps.append((at, frequency))
+            steps.append((at + sound, 0.0))
+        at += sound + silence
+    return Timeline(steps, at)
+
+
+def morse(text: str, value: float = 1.0, unit: float = 0.1) -> Timeline:
+    """Spell `text` in morse code: a dot is one `unit` of `value`, a dash three."""
+    steps = []
+    at = 0.0
+    for word in text.lower().split():
+        for letter in word:
+            for symbol in MORSE.get(letter, ""):
+                length = unit if symbol == "." else 3 * unit
+                steps.append((at, value))
+                steps.append((at + length, 0.0))
+                at += length + unit  # Gap inside a letter
+            at += 2 * unit  # Gap between letters (3 units in total)
+        at += 4 * unit  # Gap between words (7 units in total)
+    return Timeline(steps, at)
+
+
+def _apply(device, value: float):
+    """Set a device to a timeline value."""
+    if isinstance(device, TonalBuzzer):
+        if value:
+            device.play(value)
+        else:
+            device.stop()
+    elif isinstance(device, PWMLED):
+        device.value = value
+    elif value >= 0.5:
+        device.on()
+    else:
+        device.off()
+
+
+async def play(timeline: Timeline, device):
+    """Play a timeline on an LED or buzzer.
+
+    Every step is due at a fixed offset from the start on the event loop
+    clock. When the loop falls behind, steps that are already overtaken are
+    skipped so the animation catches up instead of running late. The device
+    is switched off if the animation is cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    steps = timeline.steps
+    worst = 0.0
+    skipped = 0
+
+    try:
+        i = 0
+        while i < len(steps):
+            delay = start + steps[i][0] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            now = loop.time()
+            while i + 1 < len(steps) and start + steps[i + 1][0] <= now:
+                i += 1
+                skipped += 1
+            worst = max(worst, now - (start + steps[i][0]))
+
+            _apply(device, steps[i][1])
+            i += 1
+
+        remaining = start + timeline.duration - loop.time()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+    except asyncio.CancelledError:
+        _apply(device, 0.0)
+        raise
+
+    logger.debug(
+        f"Played {len(steps)} steps in {loop.time() - start:.2f}s "
+        f"(planned {timeline.duration:.2f}s), worst lag {worst * 1000:.1f} ms, {skipped} skipped"
+    )
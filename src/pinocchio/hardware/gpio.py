@@ -1,18 +1,314 @@
 """GPIO hardware abstraction layer using gpiozero."""
 
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
 import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
 from pathlib import Path
 
 import yaml
-from gpiozero import LED, MotionSensor, TonalBuzzer
+from gpiozero import LED, PWMLED, Device, MotionSensor, TonalBuzzer
 
 logger = logging.getLogger(__name__)
 
 # Global registry of hardware components
-_hardware_registry: dict[str, LED | MotionSensor | TonalBuzzer] = {}
+_hardware_registry: dict[str, LED | PWMLED | MotionSensor | TonalBuzzer] = {}
 _initialized = False
 
 
+class Priority:
+    """How urgently a command needs a device. Higher numbers preempt lower ones."""
+
+    IDLE = 0  # Ambient animations, fine to interrupt
+    NORMAL = 10  # Tool calls made by the agent
+    ALERT = 20  # Alarms and sensor reactions
+
+
+# Priority of device leases taken by the current task, set by whoever starts it
+command_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "command_priority", default=Priority.NORMAL
+)
+
+
+class DeviceBusyError(Exception):
+    """Raised when a device stays busy for longer than the arbiter's maximum wait."""
+
+
+class DevicePreemptedError(Exception):
+    """Raised in a command that lost its device to a higher-priority command."""
+
+
+class Lease:
+    """A task's turn on one or more devices."""
+
+    def __init__(self, label: str, priority: int):
+        self.label = label
+        self.priority = priority
+        self.task = asyncio.current_task()
+        self.preempted_by: str | None = None  # Label of the command that interrupted this one
+
+
+class _Device:
+    """Command queue of one device: the current holder and a priority-ordered wait list."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.holder: Lease | None = None
+        self.waiting: list[tuple[int, int, Lease, asyncio.Future]] = []  # Heap
+        self.acquisitions = 0
+        self.preemptions = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_depth = 0
+
+
+class DeviceArbiter:
+    """Lets concurrent tools share actuators safely.
+
+    Each device (a `BaseTool.resources` name such as "buzzer") is held by one
+    command at a time. Others wait in a queue ordered by priority, then
+    arrival. A waiting command with a higher priority than the current holder
+    cancels the holder (which then raises DevicePreemptedError), so an alert
+    does not sit behind an idle animation, and no command waits longer than
+    `max_wait` seconds.
+    """
+
+    def __init__(self, max_wait: float = 30.0):
+        self.max_wait = max_wait
+        self._devices: dict[str, _Device] = {}
+        self._order = itertools.count()
+
+    @contextlib.asynccontextmanager
+    async def lease(self, resources: tuple[str, ...], label: str = "") -> AsyncIterator[Lease]:
+        """Hold every device in `resources` for the duration of the block.
+
+        Devices are taken in name order, so two commands that need the same
+        pair of devices cannot deadlock each other.
+        """
+        lease = Lease(label, command_priority.get())
+        held: list[_Device] = []
+        try:
+            for name in sorted(set(resources)):
+                device = self._devices.setdefault(name, _Device(name))
+                await self._acquire(device, lease)
+                held.append(device)
+            yield lease
+        except asyncio.CancelledError:
+            # Only our own cancellation becomes an error, any other keeps propagating
+            if lease.preempted_by is not None and lease.task.uncancel() == 0:
+                raise DevicePreemptedError(f"interrupted by {lease.preempted_by}") from None
+            raise
+        finally:
+            for device in reversed(held):
+                self._release(device)
+
+    def stats(self) -> dict:
+        """Queue depth, wait times and preemptions for each device."""
+        return {
+            name: {
+                "busy": device.holder is not None,
+                "queue_depth": len(device.waiting),
+                "max_queue_depth": device.max_depth,
+                "acquisitions": device.acquisitions,
+                "preemptions": device.preemptions,
+                "timeouts": device.timeouts,
+                "avg_wait": round(device.total_wait / max(device.acquisitions, 1), 3),
+                "max_wait": round(device.max_wait, 3),
+            }
+            for name, device in self._devices.items()
+        }
+
+    async def _acquire(self, device: _Device, lease: Lease):
+        """Wait for a turn on a device."""
+        requested = time.monotonic()
+
+        if device.holder is not None or device.waiting:
+            granted = asyncio.get_running_loop().create_future()
+            heapq.heappush(device.waiting, (-lease.priority, next(self._order), lease, granted))
+            device.max_depth = max(device.max_depth, len(device.waiting))
+
+            holder = device.holder
+            if holder is not None and lease.priority > holder.priority and not holder.preempted_by:
+                logger.info(f"{lease.label} preempts {holder.label} on {device.name}")
+                holder.preempted_by = lease.label
+                device.preemptions += 1
+                if holder.task is not None:
+                    holder.task.cancel()
+
+            try:
+                async with asyncio.timeout(self.max_wait):
+                    await granted
+            except BaseException as e:
+                if granted.done() and not granted.cancelled():
+                    self._release(device)  # Granted just as the wait was abandoned
+                else:
+                    granted.cancel()
+                    device.waiting = [item for item in device.waiting if item[3] is not granted]
+                    heapq.heapify(device.waiting)
+                if isinstance(e, TimeoutError):
+                    device.timeouts += 1
+                    holder = device.holder.label if device.holder else "another command"
+                    raise DeviceBusyError(f"{device.name} is busy with {holder}") from e
+                raise
+        else:
+            device.holder = lease
+
+        wait = time.monotonic() - requested
+        device.acquisitions += 1
+        device.total_wait += wait
+        device.max_wait = max(device.max_wait, wait)
+        if wait > 0.01:
+            logger.debug(f"{lease.label} waited {wait:.2f}s for {device.name}")
+
+    def _release(self, device: _Device):
+        """Hand a device to the next waiting command, if any."""
+        device.holder = None
+        while device.waiting:
+            _, _, lease, granted = heapq.heappop(device.waiting)
+            if not granted.done():
+                device.holder = lease
+                granted.set_result(None)
+                return
+
+
+_arbiter = DeviceArbiter()
+
+
+def get_arbiter() -> DeviceArbiter:
+    """Get the arbiter shared by everything that drives the hardware."""
+    return _arbiter
+
+
+class EventBus:
+    """Delivers hardware events to listeners on the event loop, as they happen.
+
+    Watchers publish an event name (like "motion") with the device it came
+    from and the loop time it happened. Listeners are called straight away, so
+    they should hand anything slow to a task.
+    """
+
+    def __init__(self):
+        self._listeners: list[Callable[[str, str, float], None]] = []
+
+    def listen(self, callback: Callable[[str, str, float], None]) -> Callable[[], None]:
+        """Call `callback(event, source, time)` for every event. Returns a function to stop."""
+        self._listeners.append(callback)
+        return lambda: self._listeners.remove(callback)
+
+    def publish(self, event: str, source: str, at: float):
+        """Send an event to every listener."""
+        for callback in list(self._listeners):
+            try:
+                callback(event, source, at)
+            except Exception as e:
+                logger.error(f"Error handling {event} event from {source}: {e}")
+
+
+_event_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    """Get the bus that hardware watchers publish to."""
+    return _event_bus
+
+
+class MotionEvent:
+    """A motion sensor edge: motion started (`detected`) or stopped."""
+
+    def __init__(self, sensor: str, detected: bool, time: float):
+        self.sensor = sensor
+        self.detected = detected
+        self.time = time  # Event loop clock (monotonic)
+
+
+class MotionWatcher:
+    """Follows a motion sensor through its edge callbacks instead of polling it.
+
+    gpiozero calls `when_motion`/`when_no_motion` from its own thread; the
+    events are handed to the event loop and kept in a fixed-size ring buffer,
+    so `summary()` answers from memory without touching the sensor. Any number
+    of coroutines can `subscribe()` to the same events, which are also
+    published on the event bus as "motion" and "no_motion".
+    """
+
+    def __init__(self, name: str, sensor: MotionSensor, history: int = 256):
+        self.name = name
+        self.sensor = sensor
+        self.events: deque[MotionEvent] = deque(maxlen=history)
+        self.motion_now = False
+        self.last_motion: float | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Start receiving edges on `loop`."""
+        self._loop = loop
+        self.motion_now = bool(self.sensor.motion_detected)
+        if self.motion_now:
+            self.last_motion = loop.time()
+        self.sensor.when_motion = lambda: self._on_edge(True)
+        self.sensor.when_no_motion = lambda: self._on_edge(False)
+
+    def stop(self):
+        """Stop receiving edges."""
+        self.sensor.when_motion = None
+        self.sensor.when_no_motion = None
+
+    def summary(self, window: float = 60.0) -> dict:
+        """Current state, seconds since the last motion and motion events in the last `window`."""
+        now = self._loop.time() if self._loop else time.monotonic()
+        recent = 0
+        for event in reversed(self.events):
+            if now - event.time > window:
+                break
+            recent += event.detected
+
+        return {
+            "motion_now": self.motion_now,
+            "seconds_since_motion": None if self.last_motion is None else now - self.last_motion,
+            "recent_events": recent,
+            "window": window,
+        }
+
+    async def subscribe(self) -> AsyncIterator[MotionEvent]:
+        """Yield motion events as they happen. Slow subscribers lose their oldest events."""
+        queue: asyncio.Queue[MotionEvent] = asyncio.Queue(maxsize=100)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    def _on_edge(self, detected: bool):
+        # Runs in a gpiozero thread, the event loop does the rest
+        self._loop.call_soon_threadsafe(self._record, detected, self._loop.time())
+
+    def _record(self, detected: bool, at: float):
+        event = MotionEvent(self.name, detected, at)
+        self.events.append(event)
+        if detected or self.motion_now:
+            self.last_motion = at  # Motion was seen up to the end of a detection too
+        self.motion_now = detected
+        logger.debug(f"Motion sensor '{self.name}': {'motion' if detected else 'no motion'}")
+
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+        get_event_bus().publish("motion" if detected else "no_motion", self.name, at)
+
+
+_motion_watchers: dict[str, MotionWatcher] = {}
+
+
 def _load_gpio_config() -> dict:
     """Load GPIO pin configuration from config/gpio_pins.yaml."""
     config_path = Path("config/gpio_pins.yaml")
@@ -26,12 +322,27 @@ def _load_gpio_config() -> dict:
         return config or {}
 
 
-def init_hardware():
-    """Initialize all GPIO hardware from config."""
+def configured_names(kind: str) -> list[str]:
+    """Names of one kind of device ("leds", "buzzers", ...) in config/gpio_pins.yaml."""
+    return [str(name) for name in (_load_gpio_config().get(kind) or {})]
+
+
+def init_hardware(backend: str = "hardware"):
+    """Initialize all GPIO hardware from config.
+
+    `backend="simulated"` uses recording mock pins instead of a real Pi (see
+    hardware/simulation.py).
+    """
     global _initialized
     if _initialized:
         return
 
+    if backend == "simulated":
+        from .simulation import SimulatedPinFactory
+
+        Device.pin_factory = SimulatedPinFactory()
+        logger.info("Using simulated GPIO pins")
+
     config = _load_gpio_config()
 
     if not config:
@@ -51,7 +362,8 @@ def init_hardware():
     emotion_leds = config.get("emotion_leds", {})
     for emotion, pin in emotion_leds.items():
         try:
-            _hardware_registry[f"emotion_{emotion}"] = LED(pin)
+            # PWM so animations can fade them (see hardware/animation.py)
+            _hardware_registry[f"emotion_{emotion}"] = PWMLED(pin)
             logger.info(f"Initialized emotion LED '{emotion}' on GPIO {pin}")
         except Exception as e:
             logger.error(f"Failed to initialize emotion LED '{emotion}' on GPIO {pin}: {e}")
@@ -87,7 +399,7 @@ def get_led(name: str) -> LED:
     return _hardware_registry[key]
 
 
-def get_emotion_led(emotion: str) -> LED:
+def get_emotion_led(emotion: str) -> PWMLED:
     """Get emotion LED by emotion name."""
     key = f"emotion_{emotion}"
     if key not in _hardware_registry:
@@ -117,8 +429,33 @@ def get_motion_sensor(name: str) -> MotionSensor:
     return _hardware_registry[key]
 
 
+def get_motion_watcher(name: str) -> MotionWatcher:
+    """Get the watcher of a motion sensor, starting it on the running event loop if needed."""
+    watcher = _motion_watchers.get(name)
+    if watcher is None:
+        watcher = MotionWatcher(name, get_motion_sensor(name))
+        watcher.start(asyncio.get_running_loop())
+        _motion_watchers[name] = watcher
+        logger.info(f"Watching motion sensor '{name}'")
+    return watcher
+
+
+def start_motion_watchers():
+    """Start watching every configured motion sensor (call from the running event loop)."""
+    for key in _hardware_registry:
+        if key.startswith("motion_"):
+            get_motion_watcher(key.removeprefix("motion_"))
+
+
 def cleanup_hardware():
     """Clean up all GPIO resources."""
+    for watcher in _motion_watchers.values():
+        watcher.stop()
+    _motion_watchers.clear()
+
+    if _arbiter.stats():
+        logger.info(f"Device arbiter stats: {_arbiter.stats()}")
+
     for component in _hardware_registry.values():
         try:
             component.close()
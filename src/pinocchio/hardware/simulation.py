@@ -0,0 +1,172 @@
+"""Simulated GPIO for running the hardware tools without a Raspberry Pi.
+
+`SimulatedPinFactory` stands in for the real pin factory (GPIO_BACKEND=simulated)
+and records every pin change with a timestamp. `run_simulated()` runs a
+coroutine on an event loop with a virtual clock, which jumps straight to the
+next timer whenever nothing else is ready, so a blink or melody sequence
+finishes in microseconds while its recorded timings stay exact. Work done in
+threads (such as speech synthesis) does not advance the virtual clock, so only
+simulate coroutines that wait with asyncio.sleep.
+
+Try it with:
+
+    python -m pinocchio.hardware.simulation blink_emotion '{"emotion": "happy"}'
+"""
+
+import asyncio
+import json
+import selectors
+import sys
+import time
+
+from gpiozero.pins.mock import MockFactory, MockPWMPin
+
+
+class PinTransition:
+    """A recorded change of a pin's state or PWM frequency."""
+
+    def __init__(self, time: float, pin: str, state: float, frequency: float | None):
+        self.time = time
+        self.pin = pin
+        self.state = state  # 0/1, or the duty cycle of a PWM pin
+        self.frequency = frequency
+
+    def __repr__(self) -> str:
+        frequency = f" @ {self.frequency:g} Hz" if self.frequency else ""
+        return f"<{self.time:.3f}s {self.pin}={self.state:g}{frequency}>"
+
+
+class RecordingPin(MockPWMPin):
+    """Mock pin (PWM capable, so buzzers work) that logs its changes to the factory."""
+
+    def _change_state(self, value):
+        changed = super()._change_state(value)
+        if changed:
+            self.factory.record(self)
+        return changed
+
+    def _set_frequency(self, value):
+        recorded = len(self.factory.transitions)
+        changed = value != self._frequency
+        super()._set_frequency(value)
+        # Stopping PWM also drops the state, which has been recorded already
+        if changed and len(self.factory.transitions) == recorded:
+            self.factory.record(self)
+
+
+class SimulatedPinFactory(MockFactory):
+    """gpiozero pin factory that needs no hardware and records every transition."""
+
+    def __init__(self):
+        super().__init__(pin_class=RecordingPin)
+        self.transitions: list[PinTransition] = []
+
+    def ticks(self):
+        # The running loop's clock, so recordings follow virtual time
+        try:
+            return asyncio.get_running_loop().time()
+        except RuntimeError:
+            return time.monotonic()
+
+    def record(self, pin: RecordingPin):
+        self.transitions.append(
+            PinTransition(self.ticks(), pin.info.name, pin.state, pin.frequency)
+        )
+
+    def transitions_for(self, pin: int | str) -> list[PinTransition]:
+        """Recorded transitions of one pin, by GPIO number or name."""
+        name = f"GPIO{pin}" if isinstance(pin, int) else pin
+        return [transition for transition in self.transitions if transition.pin == name]
+
+    def clear(self):
+        """Forget the recorded transitions."""
+        self.transitions.clear()
+
+
+class _VirtualSelector(selectors.BaseSelector):
+    """Selector that skips ahead in virtual time instead of sleeping."""
+
+    def __init__(self, loop: "VirtualTimeEventLoop"):
+        self._selector = selectors.DefaultSelector()
+        self._loop = loop
+
+    def select(self, timeout=None):
+        # Anything already waiting (a thread's call_soon_threadsafe) comes first
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            return self._selector.select(None)  # No timers, wait for real I/O
+        self._loop.advance(timeout)
+        return []
+
+    def register(self, fileobj, events, data=None):
+        return self._selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._selector.modify(fileobj, events, data)
+
+    def get_key(self, fileobj):
+        return self._selector.get_key(fileobj)
+
+    def get_map(self):
+        return self._selector.get_map()
+
+    def close(self):
+        self._selector.close()
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock only moves when every task is waiting on a timer."""
+
+    def __init__(self, start: float = 0.0):
+        self._virtual_time = start
+        super().__init__(_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def advance(self, seconds: float):
+        """Move the clock forward."""
+        self._virtual_time += seconds
+
+
+def run_simulated(coro, start: float = 0.0):
+    """Run a coroutine to completion in virtual time and return its result."""
+    with asyncio.Runner(loop_factory=lambda: VirtualTimeEventLoop(start)) as runner:
+        return runner.run(coro)
+
+
+def main():
+    """Run one tool on simulated pins and print what the pins did."""
+    from gpiozero import Device
+
+    from ..tools.registry import ToolRegistry
+    from .gpio import cleanup_hardware, init_hardware
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m pinocchio.hardware.simulation <tool> [json arguments]")
+        return
+
+    init_hardware(backend="simulated")
+    factory: SimulatedPinFactory = Device.pin_factory
+    registry = ToolRegistry()
+    factory.clear()
+    arguments = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
+
+    started = time.perf_counter()
+    result = run_simulated(registry.execute(sys.argv[1], arguments))
+    elapsed = time.perf_counter() - started
+
+    print(result)
+    for transition in factory.transitions:
+        print(f"  {transition!r}")
+    print(f"{len(factory.transitions)} transitions, simulated in {elapsed * 1000:.1f} ms")
+    cleanup_hardware()
+
+
+if __name__ == "__main__":
+    main()
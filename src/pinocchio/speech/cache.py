@@ -0,0 +1,145 @@
+"""Content-addressed cache of synthesized speech audio."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechCache:
+    """Two-level LRU cache of raw speech audio, keyed by voice, text and parameters.
+
+    Recently used clips are kept in memory; everything is also written to disk so
+    common phrases survive restarts. Both levels are bounded in bytes and evict
+    the least recently used clips first.
+    """
+
+    def __init__(self, cache_dir: Path | None, memory_bytes: int, disk_bytes: int):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()  # key -> file size, oldest first
+        self._disk_size = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.cache_dir is not None:
+            self._scan_disk()
+
+    @staticmethod
+    def make_key(voice: str, text: str, params: dict) -> str:
+        """Build the cache key for a piece of text spoken with a voice and parameters."""
+        payload = json.dumps([voice, text, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        """Return cached audio for the key, or None on a miss."""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+
+            if key in self._disk:
+                path = self._path(key)
+                try:
+                    audio = path.read_bytes()
+                    os.utime(path)  # Keep LRU order across restarts
+                except OSError as e:
+                    logger.warning(f"Dropping unreadable speech cache entry {key}: {e}")
+                    self._disk_size -= self._disk.pop(key)
+                else:
+                    self._disk.move_to_end(key)
+                    self._remember(key, audio)
+                    self.disk_hits += 1
+                    return audio
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, audio: bytes):
+        """Store audio under the key in memory and on disk."""
+        with self._lock:
+            self._remember(key, audio)
+
+            if self.cache_dir is None or key in self._disk or len(audio) > self.disk_bytes:
+                return
+
+            path = self._path(key)
+            temp_path = path.with_suffix(".tmp")
+            try:
+                temp_path.write_bytes(audio)
+                temp_path.replace(path)
+            except OSError as e:
+                logger.warning(f"Could not write speech cache entry: {e}")
+                return
+
+            self._disk[key] = len(audio)
+            self._disk_size += len(audio)
+
+            while self._disk_size > self.disk_bytes:
+                old_key, size = self._disk.popitem(last=False)
+                self._path(old_key).unlink(missing_ok=True)
+                self._disk_size -= size
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current sizes, for sizing the cache."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+    def _remember(self, key: str, audio: bytes):
+        """Add audio to the in-memory LRU. Must be called with the lock held."""
+        if len(audio) > self.memory_bytes:
+            return
+
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+
+        while self._memory_size > self.memory_bytes:
+            _, old_audio = self._memory.popitem(last=False)
+            self._memory_size -= len(old_audio)
+
+    def _path(self, key: str) -> Path:
+        """File holding the audio for a key."""
+        return self.cache_dir / f"{key}.pcm"
+
+    def _scan_disk(self):
+        """Index the clips already on disk, least recently used first."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entries = [(path.stat(), path) for path in self.cache_dir.glob("*.pcm")]
+        except OSError as e:
+            logger.warning(f"Speech cache directory unavailable, using memory only: {e}")
+            self.cache_dir = None
+            return
+
+        for stat, path in sorted(entries, key=lambda entry: entry[0].st_mtime):
+            self._disk[path.stem] = stat.st_size
+            self._disk_size += stat.st_size
+
+        logger.debug(f"Speech cache has {len(self._disk)} clips ({self._disk_size} bytes) on disk")
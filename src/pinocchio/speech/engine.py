@@ -0,0 +1,203 @@
+"""Long-lived Piper voice engine shared by every `speak` call."""
+
+import asyncio
+import logging
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ..config import get_settings, get_tools_config
+from .cache import SpeechCache
+
+logger = logging.getLogger(__name__)
+
+
+class PiperEngine:
+    """Keeps a Piper voice model loaded in memory between utterances.
+
+    Loading the ONNX voice is the slowest part of speaking on a Pi, so it is done
+    once and reused. If synthesis fails the voice is dropped and loaded again on
+    the next attempt. Synthesized audio is looked up in the speech cache first, so
+    repeated phrases cost almost nothing.
+
+    Synthesis is CPU-bound and blocking, so async callers go through a dedicated
+    worker thread and the event loop keeps running while a sentence is generated.
+    """
+
+    def __init__(
+        self, model_file: Path, length_scale: float = 1.0, cache: SpeechCache | None = None
+    ):
+        self.model_file = model_file
+        self.length_scale = length_scale
+        self.cache = cache
+        self._voice = None
+        self._lock = threading.Lock()  # Piper voices are not safe to share between threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="piper")
+
+    @property
+    def sample_rate(self) -> int:
+        """Sample rate of the raw audio produced by the voice."""
+        with self._lock:
+            self._load()
+            return self._voice.config.sample_rate
+
+    def load(self):
+        """Load the voice model if it is not loaded yet."""
+        with self._lock:
+            self._load()
+
+    def synthesize(self, text: str) -> bytes:
+        """Synthesize text to raw 16-bit mono PCM."""
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(
+                self.model_file.name, text, {"length_scale": self.length_scale}
+            )
+            audio = self.cache.get(key)
+            if audio is not None:
+                return audio
+
+        with self._lock:
+            for attempt in range(2):
+                self._load()
+                try:
+                    audio = b"".join(self._iter_audio(text))
+                    break
+                except Exception as e:
+                    if attempt:
+                        raise
+                    logger.warning(f"Piper voice failed ({e}), reloading it")
+                    self._voice = None
+
+        if key is not None:
+            self.cache.put(key, audio)
+        return audio
+
+    def preload(self):
+        """Start loading the voice on the worker thread without waiting for it."""
+
+        def load():
+            try:
+                self.load()
+            except Exception as e:
+                logger.warning(f"Could not preload Piper voice: {e}")
+
+        self._executor.submit(load)
+
+    def warm_up(self, phrases: list[str]):
+        """Synthesize phrases into the cache on the worker thread without waiting."""
+        from .pipeline import split_sentences
+
+        def synthesize_all():
+            for phrase in phrases:
+                # Playback is cached per sentence, so warm up the same pieces
+                for sentence in split_sentences(phrase):
+                    try:
+                        self.synthesize(sentence)
+                    except Exception as e:
+                        logger.warning(f"Could not warm up speech cache: {e}")
+                        return
+
+        if self.cache is not None and phrases:
+            self._executor.submit(synthesize_all)
+
+    async def load_async(self):
+        """Load the voice model without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.load)
+
+    async def synthesize_async(self, text: str) -> bytes:
+        """Synthesize text to raw PCM without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.synthesize, text)
+
+    def close(self):
+        """Release the loaded voice model and stop the worker thread."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._voice = None
+
+    def _load(self):
+        """Load the voice model. Must be called with the lock held."""
+        if self._voice is not None:
+            return
+
+        try:
+            from piper import PiperVoice
+        except ImportError as e:
+            raise RuntimeError(
+                "Piper not installed. Run setup script or install: pip install piper-tts"
+            ) from e
+
+        if not self.model_file.exists():
+            raise FileNotFoundError(
+                f"Voice model '{self.model_file.stem}' not found at {self.model_file}. "
+                f"Download voices from: https://github.com/rhasspy/piper/releases"
+            )
+
+        logger.info(f"Loading Piper voice from {self.model_file}")
+        self._voice = PiperVoice.load(str(self.model_file))
+
+    def _iter_audio(self, text: str) -> Iterator[bytes]:
+        """Yield raw audio for the text from whichever Piper API is installed."""
+        if hasattr(self._voice, "synthesize_stream_raw"):  # piper-tts 1.2
+            yield from self._voice.synthesize_stream_raw(text, length_scale=self.length_scale)
+        else:  # piper-tts 1.3+
+            from piper import SynthesisConfig
+
+            config = SynthesisConfig(length_scale=self.length_scale)
+            for chunk in self._voice.synthesize(text, syn_config=config):
+                yield chunk.audio_int16_bytes
+
+
+# Global engine instance
+_engine: PiperEngine | None = None
+
+
+def get_engine() -> PiperEngine:
+    """Get the global Piper engine for the configured voice."""
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        model_dir = Path(settings.piper_model_path).expanduser()
+
+        cache = None
+        if settings.speech_cache_enabled:
+            cache = SpeechCache(
+                Path(settings.speech_cache_dir).expanduser(),
+                memory_bytes=settings.speech_cache_memory_mb * 1024 * 1024,
+                disk_bytes=settings.speech_cache_disk_mb * 1024 * 1024,
+            )
+
+        _engine = PiperEngine(
+            model_dir / f"{settings.piper_voice}.onnx",
+            length_scale=settings.piper_length_scale,
+            cache=cache,
+        )
+    return _engine
+
+
+def init_speech():
+    """Start loading the voice in the background if the speak tool is enabled.
+
+    Phrases listed under `warmup_phrases` for the speak tool in config/tools.yaml
+    are synthesized into the cache right after the voice loads.
+    """
+    speak_config = get_tools_config().get("tools", {}).get("speak", {})
+    if not speak_config.get("enabled", False):
+        return
+
+    engine = get_engine()
+    engine.preload()
+    engine.warm_up(speak_config.get("warmup_phrases") or [])
+
+
+def cleanup_speech():
+    """Release the voice model."""
+    global _engine
+    if _engine is not None:
+        if _engine.cache is not None:
+            logger.info(f"Speech cache stats: {_engine.cache.stats()}")
+        _engine.close()
+        _engine = None
@@ -0,0 +1,88 @@
+"""Sentence-by-sentence speech playback that overlaps synthesis with audio output."""
+
+import asyncio
+import logging
+import re
+
+from .engine import PiperEngine
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends at ., ! or ? followed by whitespace, or at a line break
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# aplay reading raw 16-bit mono PCM from stdin; the sample rate is appended
+_APLAY_RAW = ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r"]
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences that can be synthesized independently."""
+    return [sentence.strip() for sentence in _SENTENCE_BREAK.split(text) if sentence.strip()]
+
+
+class SpeechPipeline:
+    """Plays text one sentence at a time, synthesizing sentence N+1 while N plays.
+
+    Raw PCM is written straight into aplay's stdin, so nothing touches the SD card
+    and the first sound comes out as soon as the first sentence is synthesized.
+    Everything runs on the event loop (synthesis on the engine's worker thread),
+    and cancelling `speak` stops playback immediately.
+    """
+
+    def __init__(self, engine: PiperEngine, lookahead: int = 2):
+        self.engine = engine
+        self.lookahead = lookahead  # Sentences synthesized ahead of playback
+
+    async def speak(self, text: str, timeout: float = 30):
+        """Synthesize and play text, returning when playback has finished."""
+        sentences = split_sentences(text)
+        if not sentences:
+            return
+
+        await self.engine.load_async()
+        rate = str(self.engine.sample_rate)
+
+        audio_queue: asyncio.Queue = asyncio.Queue(maxsize=self.lookahead)
+
+        async def synthesize_all():
+            try:
+                for sentence in sentences:
+                    await audio_queue.put(await self.engine.synthesize_async(sentence))
+            except Exception as e:
+                await audio_queue.put(e)
+                return
+            await audio_queue.put(None)
+
+        player = await asyncio.create_subprocess_exec(
+            *_APLAY_RAW,
+            rate,
+            "-",
+            stdin=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        producer = asyncio.create_task(synthesize_all())
+
+        try:
+            while (audio := await asyncio.wait_for(audio_queue.get(), timeout)) is not None:
+                if isinstance(audio, Exception):
+                    raise audio
+                player.stdin.write(audio)
+                # Waits while aplay's buffer is full, pacing us to the playback
+                await player.stdin.drain()
+
+            player.stdin.close()
+            await asyncio.wait_for(player.wait(), timeout)
+        except (BrokenPipeError, ConnectionResetError):
+            await asyncio.wait_for(player.wait(), timeout)
+        finally:
+            # The producer may be blocked on a full queue that nobody reads any more
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            if player.returncode is None:
+                player.kill()
+                await player.wait()
+
+        if player.returncode != 0:
+            stderr = (await player.stderr.read()).decode(errors="replace")
+            logger.error(f"aplay error: {stderr}")
+            raise RuntimeError("Audio playback failed. Is aplay installed?")
@@ -25,6 +25,21 @@ class BaseTool(ABC):
     description: str
     parameters: dict[str, ToolParameter]
 
+    # Hardware resources this tool drives (e.g. "buzzer"). Calls that share a
+    # resource run one after another, everything else runs concurrently.
+    resources: tuple[str, ...] = ()
+    # Barrier tools (like `wait`) run after every earlier call and before every later one
+    barrier: bool = False
+    # Speculative tools are safe to start while the model is still streaming its reply
+    speculative: bool = False
+    # Commands run without asking the model: a regex for the whole (lowercase)
+    # message, mapped to fixed arguments. Named groups fill in the other arguments.
+    intents: dict[str, dict] = {}
+
+    def attach(self, registry) -> None:
+        """Called when the tool is registered, for tools that run other tools."""
+        pass
+
     @abstractmethod
     async def execute(self, **kwargs) -> str:
         """Execute the tool and return result as string."""
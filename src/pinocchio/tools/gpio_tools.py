@@ -1,32 +1,25 @@
-import asyncio
-
-from ..hardware.gpio import get_buzzer, get_emotion_led, get_led
+from ..hardware.animation import Timeline, beep_pattern, blink, melody, morse, play, pulse
+from ..hardware.gpio import (
+    configured_names,
+    get_buzzer,
+    get_emotion_led,
+    get_led,
+    get_motion_watcher,
+)
 from .base import BaseTool, ToolParameter
 
-# Musical note frequencies (in Hz) for melodies
-NOTES = {
-    "C4": 261.63,
-    "D4": 293.66,
-    "E4": 329.63,
-    "F4": 349.23,
-    "G4": 392.00,
-    "A4": 440.00,
-    "B4": 493.88,
-    "C5": 523.25,
-    "D5": 587.33,
-    "E5": 659.25,
-    "F5": 698.46,
-    "G5": 783.99,
-    "A5": 880.00,
-    "REST": 0,  # Silence/rest
-}
-
 
 class ToggleLEDTool(BaseTool):
     """Control an LED (requires GPIO hardware)."""
 
     name = "toggle_led"
     description = "Turn an LED on or off. Available LEDs: 'status'"
+    resources = ("leds",)
+    speculative = True
+    intents = {
+        r"turn (?P<state>on|off) (?:the )?(?P<led_name>\w+) (?:led|light)": {},
+        r"turn (?:the )?(?P<led_name>\w+) (?:led|light) (?P<state>on|off)": {},
+    }
     parameters = {
         "led_name": ToolParameter(
             type="string",
@@ -37,6 +30,17 @@ class ToggleLEDTool(BaseTool):
         ),
     }
 
+    def __init__(self):
+        # Only the LEDs that are wired up, so "turn on the kitchen light" isn't taken for one
+        leds = configured_names("leds")
+        if leds:
+            names = ", ".join(f"'{name}'" for name in leds)
+            self.description = f"Turn an LED on or off. Available LEDs: {names}"
+            self.parameters = {
+                **self.parameters,
+                "led_name": ToolParameter(type="string", description="Name of the LED", enum=leds),
+            }
+
     async def execute(self, led_name: str, state: str) -> str:
         try:
             led = get_led(led_name)
@@ -58,7 +62,10 @@ class CheckMotionTool(BaseTool):
     """Check motion sensor (requires GPIO hardware)."""
 
     name = "check_motion"
-    description = "Check if motion is detected by a PIR sensor"
+    description = (
+        "Check if motion is detected by a PIR sensor, and how recently and how often it saw motion"
+    )
+    speculative = True
     parameters = {
         "sensor_name": ToolParameter(
             type="string", description="Name of the motion sensor"
@@ -66,7 +73,19 @@ class CheckMotionTool(BaseTool):
     }
 
     async def execute(self, sensor_name: str) -> str:
-        return f"Motion sensor '{sensor_name}' would be checked (GPIO not implemented yet)"
+        try:
+            # Answered from the watcher's event history, without reading the sensor
+            summary = get_motion_watcher(sensor_name).summary()
+        except ValueError as e:
+            return f"❌ Error: {str(e)}"
+
+        if summary["seconds_since_motion"] is None:
+            last = "No motion seen since I started watching"
+        else:
+            last = f"Last motion {summary['seconds_since_motion']:.0f}s ago"
+        now = "👀 Motion detected right now!" if summary["motion_now"] else "No motion right now."
+
+        return f"{now} {last}, {summary['recent_events']} events in the last minute"
 
 
 class ExpressEmotionTool(BaseTool):
@@ -82,6 +101,14 @@ class ExpressEmotionTool(BaseTool):
         "'neutral' (all LEDs off - calm, idle state). "
         "Only one emotion can be shown at a time - the previous emotion LED will turn off."
     )
+    resources = ("emotion_leds",)
+    speculative = True
+    intents = {
+        r"(?:be|feel|look|act|show(?: me)?) (?P<emotion>excited|happy|curious|neutral)": {},
+        r"turn off (?:all )?(?:the |your )?(?:emotion )?(?:leds|lights)|calm down": {
+            "emotion": "neutral"
+        },
+    }
     parameters = {
         "emotion": ToolParameter(
             type="string",
@@ -131,6 +158,8 @@ class PulseEmotionTool(BaseTool):
         "Pulse/breathe an emotion LED to show intensity of feeling. Creates a smooth fade in/out effect. "
         "Available emotions: 'excited' (red), 'happy' (green), 'curious' (yellow)"
     )
+    resources = ("emotion_leds",)
+    speculative = True
     parameters = {
         "emotion": ToolParameter(
             type="string",
@@ -160,8 +189,8 @@ class PulseEmotionTool(BaseTool):
 
             led = get_emotion_led(emotion)
 
-            # Pulse the LED
-            led.pulse(fade_in_time=duration / 2, fade_out_time=duration / 2, n=pulses, background=False)
+            # Pulse the LED without blocking the event loop
+            await play(pulse(duration / 2, duration / 2, pulses), led)
 
             # Turn on after pulsing
             led.on()
@@ -188,6 +217,8 @@ class BlinkEmotionTool(BaseTool):
         "Blink an emotion LED on and off to show bursts of feeling or get attention. "
         "Available emotions: 'excited' (red), 'happy' (green), 'curious' (yellow)"
     )
+    resources = ("emotion_leds",)
+    speculative = True
     parameters = {
         "emotion": ToolParameter(
             type="string",
@@ -218,11 +249,7 @@ class BlinkEmotionTool(BaseTool):
             led = get_emotion_led(emotion)
 
             # Blink pattern
-            for _ in range(times):
-                led.on()
-                await asyncio.sleep(speed)
-                led.off()
-                await asyncio.sleep(speed)
+            await play(blink(times, speed, speed), led)
 
             # Leave it on at the end
             led.on()
@@ -252,6 +279,7 @@ class PlayToneTool(BaseTool):
         "Higher frequencies (800-2000 Hz) = high-pitched beeps. "
         "Use this for alerts, notifications, or simple sounds!"
     )
+    resources = ("buzzer",)
     parameters = {
         "frequency": ToolParameter(
             type="number",
@@ -267,10 +295,8 @@ class PlayToneTool(BaseTool):
         try:
             buzzer = get_buzzer("main")
 
-            # Play the tone
-            buzzer.play(frequency)
-            await asyncio.sleep(duration)
-            buzzer.stop()
+            # Played as a timeline so a cancelled call silences the buzzer
+            await play(Timeline([(0.0, frequency), (duration, 0.0)], duration), buzzer)
 
             return f"🔊 Played {frequency} Hz tone for {duration}s"
 
@@ -290,6 +316,7 @@ class PlayMelodyTool(BaseTool):
         "Example: ['C4', 'E4', 'G4', 'C5'] plays a C major chord ascending. "
         "Use 'REST' for pauses in the melody. Great for alerts, celebrations, or musical expression!"
     )
+    resources = ("buzzer",)
     parameters = {
         "notes": ToolParameter(
             type="array",
@@ -304,28 +331,16 @@ class PlayMelodyTool(BaseTool):
 
     async def execute(self, notes: list[str], note_duration: float = 0.3) -> str:
         try:
-            buzzer = get_buzzer("main")
-
-            played_notes = []
-            for note in notes:
-                note_upper = note.upper()
-
-                if note_upper not in NOTES:
-                    return f"❌ Unknown note '{note}'. Available: C4, D4, E4, F4, G4, A4, B4, C5, D5, E5, F5, G5, A5, REST"
-
-                freq = NOTES[note_upper]
-
-                if freq == 0:  # REST
-                    buzzer.stop()
-                else:
-                    buzzer.play(freq)
+            timeline = melody(notes, note_duration)
+        except ValueError as e:
+            return f"❌ {e}"
 
-                await asyncio.sleep(note_duration)
-                played_notes.append(note_upper)
+        try:
+            buzzer = get_buzzer("main")
 
-            buzzer.stop()
+            await play(timeline, buzzer)
 
-            note_list = ", ".join(played_notes)
+            note_list = ", ".join(note.upper() for note in notes)
             return f"🎵 Played melody: {note_list}"
 
         except ValueError as e:
@@ -346,6 +361,7 @@ class BeepPatternTool(BaseTool):
         "'short-short-short' = triple beep notification. "
         "Use for: alerts, confirmations, alarms, attention-getting, morse code!"
     )
+    resources = ("buzzer",)
     parameters = {
         "pattern": ToolParameter(
             type="string",
@@ -358,37 +374,54 @@ class BeepPatternTool(BaseTool):
     }
 
     async def execute(self, pattern: str, frequency: float = 800) -> str:
+        try:
+            timeline = beep_pattern(pattern, frequency)
+        except ValueError as e:
+            return f"❌ {e}"
+
         try:
             buzzer = get_buzzer("main")
 
-            # Define timing for pattern elements
-            timings = {
-                "short": 0.15,  # Short beep
-                "long": 0.5,  # Long beep
-                "pause": 0.3,  # Pause/silence
-            }
+            await play(timeline, buzzer)
 
-            parts = pattern.lower().split("-")
+            return f"🔔 Played pattern: {pattern}"
 
-            for part in parts:
-                part = part.strip()
+        except ValueError as e:
+            return f"❌ Error: {str(e)}"
+        except Exception as e:
+            return f"❌ Failed to play beep pattern: {str(e)}"
 
-                if part == "pause":
-                    buzzer.stop()
-                    await asyncio.sleep(timings["pause"])
-                elif part in ["short", "long"]:
-                    buzzer.play(frequency)
-                    await asyncio.sleep(timings[part])
-                    buzzer.stop()
-                    await asyncio.sleep(0.1)  # Small gap between beeps
-                else:
-                    return f"❌ Unknown pattern element '{part}'. Use: short, long, pause"
 
-            buzzer.stop()
+class MorseCodeTool(BaseTool):
+    """Spell out a message in morse code through the speaker."""
 
-            return f"🔔 Played pattern: {pattern}"
+    name = "morse_code"
+    description = (
+        "Spell out a short message in morse code with beeps through the speaker. "
+        "Letters and digits only, other characters are skipped. "
+        "Great for secret messages and spy games!"
+    )
+    resources = ("buzzer",)
+    parameters = {
+        "text": ToolParameter(
+            type="string",
+            description="The message to spell, e.g. 'SOS' or 'hello'",
+        ),
+        "frequency": ToolParameter(
+            type="number",
+            description="Beep frequency in Hz (default: 700)",
+        ),
+    }
+
+    async def execute(self, text: str, frequency: float = 700) -> str:
+        try:
+            buzzer = get_buzzer("main")
+
+            await play(morse(text, frequency), buzzer)
+
+            return f"📡 Sent in morse code: {text.upper()}"
 
         except ValueError as e:
             return f"❌ Error: {str(e)}"
         except Exception as e:
-            return f"❌ Failed to play beep pattern: {str(e)}"
+            return f"❌ Failed to send morse code: {str(e)}"
@@ -0,0 +1,92 @@
+import asyncio
+
+from .base import BaseTool, ToolParameter
+
+MAX_STEPS = 50
+
+
+class RunSequenceTool(BaseTool):
+    """Run a choreography of other tools in a single call."""
+
+    name = "run_sequence"
+    description = (
+        "Run several tools in one go, like a light-and-sound show, instead of calling them "
+        "one at a time. Each step names a tool, its arguments and an optional delay in seconds. "
+        "In 'sequence' mode steps run in order and the delay is a pause before the step. "
+        "In 'parallel' mode steps run together and the delay is when the step starts. "
+        "Example: [{'tool': 'express_emotion', 'arguments': {'emotion': 'happy'}}, "
+        "{'tool': 'play_melody', 'arguments': {'notes': ['C4', 'E4', 'G4']}, 'delay': 0.5}]"
+    )
+    # Steps lease their own devices, this keeps the routine in order with other calls
+    barrier = True
+    parameters = {
+        "steps": ToolParameter(
+            type="array",
+            description="The steps to run: objects with 'tool', 'arguments' and optional 'delay'",
+            items={
+                "type": "object",
+                "properties": {
+                    "tool": {"type": "string"},
+                    "arguments": {"type": "object"},
+                    "delay": {"type": "number"},
+                },
+                "required": ["tool"],
+            },
+        ),
+        "mode": ToolParameter(
+            type="string",
+            description="'sequence' runs steps one after another, 'parallel' runs them together",
+            enum=["sequence", "parallel"],
+        ),
+    }
+
+    def __init__(self):
+        self.tool_registry = None
+
+    def attach(self, registry):
+        self.tool_registry = registry
+
+    async def execute(self, steps: list[dict], mode: str = "sequence") -> str:
+        if self.tool_registry is None:
+            return "❌ run_sequence is not attached to a tool registry"
+
+        # Check every step before running any of them
+        if not steps:
+            return "❌ No steps to run"
+        if len(steps) > MAX_STEPS:
+            return f"❌ Too many steps ({len(steps)}), the limit is {MAX_STEPS}"
+        for number, step in enumerate(steps, 1):
+            tool = step.get("tool") if isinstance(step, dict) else None
+            if tool == self.name:
+                return f"❌ Step {number}: run_sequence cannot run itself"
+            if tool not in self.tool_registry.tools:
+                return f"❌ Step {number}: unknown tool '{tool}'"
+            if not isinstance(step.get("arguments", {}), dict):
+                return f"❌ Step {number}: arguments must be an object"
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        if mode == "parallel":
+            results = await asyncio.gather(
+                *(self._run_step(step, start + float(step.get("delay", 0))) for step in steps)
+            )
+        else:
+            results = []
+            for step in steps:
+                start_at = loop.time() + float(step.get("delay", 0))
+                results.append(await self._run_step(step, start_at))
+
+        lines = [f"🎬 Ran {len(steps)} steps in {loop.time() - start:.1f}s ({mode}):"]
+        lines += [
+            f"{number}. {step['tool']}: {result}"
+            for number, (step, result) in enumerate(zip(steps, results), 1)
+        ]
+        return "\n".join(lines)
+
+    async def _run_step(self, step: dict, start_at: float) -> str:
+        """Run one step through the registry once its start time comes."""
+        delay = start_at - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await self.tool_registry.execute(step["tool"], step.get("arguments") or {})
@@ -2,6 +2,7 @@ import inspect
 import logging
 
 from ..config import get_tools_config
+from ..hardware.gpio import DeviceBusyError, DevicePreemptedError, get_arbiter
 from .base import BaseTool
 
 logger = logging.getLogger(__name__)
@@ -12,16 +13,17 @@ class ToolRegistry:
 
     def __init__(self):
         self.tools: dict[str, BaseTool] = {}
+        self._definitions: list[dict] | None = None  # Cached OpenAI tool schemas
         self._discover_tools()
 
     def _discover_tools(self):
         """Auto-discover and register all tool classes."""
-        from . import gpio_tools, utility_tools, voice_tools
+        from . import gpio_tools, macro_tools, utility_tools, voice_tools
 
         tools_config = get_tools_config()
         enabled_tools = tools_config.get("tools", {})
 
-        modules = [utility_tools, gpio_tools, voice_tools]
+        modules = [utility_tools, gpio_tools, voice_tools, macro_tools]
 
         for module in modules:
             for name in dir(module):
@@ -38,26 +40,50 @@ class ToolRegistry:
                         if tool.name in enabled_tools and enabled_tools[tool.name].get(
                             "enabled", False
                         ):
-                            self.tools[tool.name] = tool
-                            logger.info(f"Registered tool: {tool.name}")
+                            self.register(tool)
                         else:
                             logger.debug(f"Tool {tool.name} is disabled in config")
 
                     except Exception as e:
                         logger.warning(f"Failed to instantiate tool {name}: {e}")
 
+    def register(self, tool: BaseTool):
+        """Add a tool to the registry."""
+        self.tools[tool.name] = tool
+        tool.attach(self)
+        self._definitions = None
+        logger.info(f"Registered tool: {tool.name}")
+
+    def unregister(self, tool_name: str):
+        """Remove a tool from the registry."""
+        if self.tools.pop(tool_name, None) is not None:
+            self._definitions = None
+            logger.info(f"Unregistered tool: {tool_name}")
+
     def get_tool_definitions(self) -> list[dict]:
-        """Get all enabled tools in OpenAI function format."""
-        return [tool.to_openai_function() for tool in self.tools.values()]
+        """Get all enabled tools in OpenAI function format.
+
+        The list is built once and reused until the registry changes, so every
+        request sends the exact same tool block and provider prompt caches can hit.
+        """
+        if self._definitions is None:
+            self._definitions = [tool.to_openai_function() for tool in self.tools.values()]
+        return self._definitions
 
     async def execute(self, tool_name: str, arguments: dict) -> str:
         """Execute a tool by name with given arguments."""
         if tool_name not in self.tools:
             return f"Error: Unknown tool '{tool_name}'"
 
+        tool = self.tools[tool_name]
         try:
-            result = await self.tools[tool_name].execute(**arguments)
-            return result
+            # Wait for the devices this tool drives, other sessions may be using them
+            async with get_arbiter().lease(tool.resources, label=tool_name):
+                return await tool.execute(**arguments)
+        except DevicePreemptedError as e:
+            return f"⏹️ {tool_name} was {e}"
+        except DeviceBusyError as e:
+            return f"❌ {tool_name} could not run: {e}"
         except Exception as e:
             logger.error(f"Error executing tool {tool_name}: {e}")
             return f"Error executing {tool_name}: {str(e)}"
@@ -9,6 +9,11 @@ class GetTimeTool(BaseTool):
 
     name = "get_time"
     description = "Get the current date and time"
+    speculative = True
+    intents = {
+        r"what(?:'s| is) the time|what time is it|(?:tell me )?the time": {},
+        r"what(?:'s| is) the date|what day is it(?: today)?": {},
+    }
     parameters = {}
 
     async def execute(self) -> str:
@@ -21,6 +26,7 @@ class WaitTool(BaseTool):
 
     name = "wait"
     description = "Wait or sleep for a specified number of seconds. Useful for creating delays between actions like blinking LEDs."
+    barrier = True
     parameters = {
         "seconds": ToolParameter(
             type="number",
@@ -0,0 +1,67 @@
+"""Non-blocking line input for the terminal chat."""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LineReader:
+    """Reads lines from stdin without blocking the event loop.
+
+    The event loop watches the stdin file descriptor where it can (Linux and
+    macOS), otherwise a daemon thread does the blocking reads. Either way lines
+    land in a queue, so `readline()` can be cancelled without losing input.
+    """
+
+    def __init__(self):
+        # Piped input is a script to answer line by line, not someone interrupting
+        self.interactive = sys.stdin is not None and sys.stdin.isatty()
+        self._lines: asyncio.Queue[str | None] = asyncio.Queue()
+        self._buffer = b""
+        self._fd: int | None = None
+
+    def start(self):
+        """Start reading stdin in the background."""
+        loop = asyncio.get_running_loop()
+        try:
+            fd = sys.stdin.fileno()
+            loop.add_reader(fd, self._on_readable, fd)
+            self._fd = fd
+        except (AttributeError, OSError, NotImplementedError, ValueError):
+            # No selectable stdin (Windows, redirected or replaced streams)
+            logger.debug("Reading stdin from a thread")
+            thread = threading.Thread(target=self._read_blocking, args=(loop,), daemon=True)
+            thread.start()
+
+    async def readline(self) -> str | None:
+        """Wait for the next line, without its newline. Returns None at end of input."""
+        return await self._lines.get()
+
+    def close(self):
+        """Stop watching stdin."""
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            self._fd = None
+
+    def _on_readable(self, fd: int):
+        data = os.read(fd, 4096)
+        if not data:
+            self.close()
+            if self._buffer:
+                self._lines.put_nowait(self._buffer.decode(errors="replace"))
+            self._lines.put_nowait(None)
+            return
+
+        # A read can hold several lines, or only part of one
+        *lines, self._buffer = (self._buffer + data).split(b"\n")
+        for line in lines:
+            self._lines.put_nowait(line.rstrip(b"\r").decode(errors="replace"))
+
+    def _read_blocking(self, loop: asyncio.AbstractEventLoop):
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(self._lines.put_nowait, line.rstrip("\r\n"))
+        loop.call_soon_threadsafe(self._lines.put_nowait, None)